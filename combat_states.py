@@ -3,18 +3,26 @@
 
 import pygame
 import random
+import functools
 from config import *
 from systems import *
-from components import Item
+from components import Item, Stats, Info, Inventory, Equipment, Resources
 from menu_states import BaseState
 
-def d100():
-    """Helper function for dice rolls."""
-    return random.randint(1, 100)
+@functools.lru_cache(maxsize=64)
+def hp_line(current_hp, max_hp):
+    """Returns the HP readout text and its color; HP only changes once per turn, so results are cached."""
+    # Above half is green, above a fifth yellow; compared as integers so no division is needed
+    if not max_hp:
+        color = RED
+    else:
+        color = GREEN if current_hp * 2 > max_hp else YELLOW if current_hp * 5 > max_hp else RED
+    return f"HP: {current_hp} / {max_hp}", color
 
 class CombatScreen(BaseState):
-    def __init__(self, game, world, player_id, monster_id, monster_key, area):
+    def __init__(self, game, world, player_id, monster_id, monster_key, area, parent_gameplay=None):
         super().__init__(game)
+        self.parent_gameplay = parent_gameplay  # GameplayScreen that started this fight
         self.world = world
         self.player_id = player_id
         self.monster_id = monster_id
@@ -24,6 +32,7 @@ class CombatScreen(BaseState):
         self.log_font = load_font(FONT_NAME, 22)
         self.small_font = load_font(FONT_NAME, 16)
         self.combat_log = ["Combat has begun!"]
+        self.log_surface = None  # Pre-rendered combat log, rebuilt only when the log changes
         self.player_action = None
         self.menu_options = ['Attack', 'Change Equipment', 'Cast Spell', 'Use Belt Item', 'Flee']
         self.selected_index = 0
@@ -33,16 +42,32 @@ class CombatScreen(BaseState):
         self.submenu_items = []
         self.submenu_selected = 0
 
+        # The menu text never changes, so render every label (in both highlight states) up front
+        self.menu_surfaces = [(render_text(self.font, option, WHITE), render_text(self.font, option, YELLOW))
+                              for option in self.menu_options]
+        self.submenu_title_surfaces = {name: render_text(self.font, f"{name.title()} Actions", YELLOW)
+                                       for name in ('equipment', 'spell', 'belt')}
+        self.submenu_hint_surface = render_text(self.small_font, "Enter: Select | Escape: Back", GREY)
+
+        # Both combatants live for the whole encounter, so fetch their components once
+        self.player_stats = world.get_component(player_id, Stats)
+        self.player_info = world.get_component(player_id, Info)
+        self.inventory = world.get_component(player_id, Inventory)
+        self.equipment = world.get_component(player_id, Equipment)
+        self.resources = world.get_component(player_id, Resources)
+        self.monster_stats = world.get_component(monster_id, Stats)
+        self.monster_info = world.get_component(monster_id, Info)
+
     def handle_events(self, event):
-        if self.is_combat_over:
-            if event.type == pygame.KEYDOWN: self.game.pop_state() 
+        if event.type != pygame.KEYDOWN:
             return
-            
-        if event.type == pygame.KEYDOWN:
-            if self.in_submenu:
-                self.handle_submenu_input(event)
-            else:
-                self.handle_main_menu_input(event)
+
+        if self.is_combat_over:
+            self.game.pop_state()
+        elif self.in_submenu:
+            self.handle_submenu_input(event)
+        else:
+            self.handle_main_menu_input(event)
 
     def handle_main_menu_input(self, event):
         if event.key == pygame.K_UP: 
@@ -86,24 +111,24 @@ class CombatScreen(BaseState):
         self.submenu_items = []
         self.submenu_selected = 0
         
-        inventory = self.world.get_component(self.player_id, "Inventory")
-        equipment = self.world.get_component(self.player_id, "Equipment")
+        inventory = self.inventory
+        equipment = self.equipment
         
         # Add inventory items that can be equipped
-        for item_id in inventory.items:
-            item = self.world.get_component(item_id, "Item")
-            if item and item.slot in equipment.slots:
+        for item_id in inventory:
+            item = self.world.get_component(item_id, Item)
+            if item and item.slot_id is not None:
                 self.submenu_items.append({
                     'type': 'equip',
                     'item_id': item_id,
                     'name': f"Equip {item.name}",
-                    'slot': item.slot
+                    'slot': item.slot_id
                 })
         
         # Add equipped items that can be unequipped
-        for slot, item_id in equipment.slots.items():
-            if item_id:
-                item = self.world.get_component(item_id, "Item")
+        for slot, item_id in enumerate(equipment.slots):
+            if item_id is not None:
+                item = self.world.get_component(item_id, Item)
                 if item:
                     self.submenu_items.append({
                         'type': 'unequip',
@@ -124,29 +149,13 @@ class CombatScreen(BaseState):
         """Open submenu for using belt items (consumables) during combat."""
         self.in_submenu = True
         self.current_submenu = 'belt'
-        self.submenu_items = []
         self.submenu_selected = 0
         
-        inventory = self.world.get_component(self.player_id, "Inventory")
-        
         # Find consumable items in inventory
-        for item_id in inventory.items:
-            item = self.world.get_component(item_id, "Item")
-            if item and item.slot == 'consumable':
-                effect_text = ""
-                if hasattr(item, 'effect'):
-                    if item.effect == 'heal':
-                        effect_text = f" (Heal {getattr(item, 'effect_value', 4)} HP)"
-                    elif item.effect == 'add_oil':
-                        effect_text = f" (+{getattr(item, 'effect_value', 1)} Oil)"
-                    elif item.effect == 'add_food':
-                        effect_text = f" (+{getattr(item, 'effect_value', 1)} Food)"
-                
-                self.submenu_items.append({
-                    'type': 'consumable',
-                    'item_id': item_id,
-                    'name': f"{item.name}{effect_text}"
-                })
+        get_item = self.world.get_component
+        self.submenu_items = [{'type': 'consumable', 'item_id': item_id, 'name': item.display_name}
+                              for item_id, item in ((i, get_item(i, Item)) for i in self.inventory)
+                              if item and item.slot == 'consumable']
         
         if not self.submenu_items:
             self.submenu_items.append({'type': 'none', 'name': "No belt items available"})
@@ -173,24 +182,11 @@ class CombatScreen(BaseState):
 
     def handle_equipment_action(self, item_data):
         """Handle equipping/unequipping items during combat."""
-        equipment = self.world.get_component(self.player_id, "Equipment")
-        inventory = self.world.get_component(self.player_id, "Inventory")
+        equipment = self.equipment
+        inventory = self.inventory
         
         if item_data['type'] == 'equip':
-            # Equip item
-            item_id = item_data['item_id']
-            slot = item_data['slot']
-            
-            # If slot is occupied, move current item to inventory
-            if equipment.slots[slot] is not None:
-                old_item = equipment.slots[slot]
-                inventory.items.append(old_item)
-            
-            # Equip new item
-            equipment.slots[slot] = item_id
-            inventory.items.remove(item_id)
-            
-            item = self.world.get_component(item_id, "Item")
+            item = equip_item(self.world, self.player_id, item_data['item_id'])
             self.player_action = f"Equipped {item.name}"
             
         elif item_data['type'] == 'unequip':
@@ -199,9 +195,10 @@ class CombatScreen(BaseState):
             slot = item_data['slot']
             
             equipment.slots[slot] = None
-            inventory.items.append(item_id)
+            inventory.add(item_id)
             
-            item = self.world.get_component(item_id, "Item")
+            item = self.world.get_component(item_id, Item)
+            apply_item_bonuses(self.player_stats, item, -1)
             self.player_action = f"Unequipped {item.name}"
         
         # Update player stats after equipment change
@@ -215,23 +212,23 @@ class CombatScreen(BaseState):
     def handle_belt_action(self, item_data):
         """Handle using consumable items during combat."""
         item_id = item_data['item_id']
-        item = self.world.get_component(item_id, "Item")
-        inventory = self.world.get_component(self.player_id, "Inventory")
-        stats = self.world.get_component(self.player_id, "Stats")
-        resources = self.world.get_component(self.player_id, "Resources")
+        item = self.world.get_component(item_id, Item)
+        inventory = self.inventory
+        stats = self.player_stats
+        resources = self.resources
         
         # Use the item
-        if hasattr(item, 'effect'):
+        if item.effect is not None:
             if item.effect == 'heal':
-                heal_amount = getattr(item, 'effect_value', 4)
+                heal_amount = item.effect_value
                 stats.current_hp = min(stats.max_hp, stats.current_hp + heal_amount)
                 self.player_action = f"Used {item.name}, healed {heal_amount} HP!"
             elif item.effect == 'add_oil':
-                oil_amount = getattr(item, 'effect_value', 1)
+                oil_amount = item.effect_value
                 resources.oil += oil_amount
                 self.player_action = f"Used {item.name}, gained {oil_amount} oil!"
             elif item.effect == 'add_food':
-                food_amount = getattr(item, 'effect_value', 1)
+                food_amount = item.effect_value
                 resources.food += food_amount
                 self.player_action = f"Used {item.name}, gained {food_amount} food!"
             else:
@@ -240,59 +237,57 @@ class CombatScreen(BaseState):
             self.player_action = f"Used {item.name}!"
         
         # Remove item from inventory
-        inventory.items.remove(item_id)
+        inventory.remove(item_id)
         self.world.remove_entity(item_id)
 
     def update(self):
-        if self.player_action and not self.is_combat_over and not self.in_submenu:
-            if self.player_action in ['Attack', 'Flee']:
-                self.resolve_combat_round()
-            else:
-                # Non-attack actions still consume the turn but don't trigger normal combat
-                self.combat_log.clear()
-                self.combat_log.append(self.player_action)
-                self.monster_turn()
-            
-            self.player_action = None 
-            self.check_for_end_of_combat()
+        # Combat is turn-based: nothing to do until the player has chosen an action
+        if self.player_action is None or self.is_combat_over or self.in_submenu:
+            return
+
+        if self.player_action in ['Attack', 'Flee']:
+            self.resolve_combat_round()
+        else:
+            # Non-attack actions still consume the turn but don't trigger normal combat
+            self.clear_log()
+            self.add_log(self.player_action)
+            self.monster_turn()
+        
+        self.player_action = None 
+        self.check_for_end_of_combat()
 
     def monster_turn(self):
         """Handle the monster's turn."""
-        player_stats = self.world.get_component(self.player_id, "Stats")
-        monster_stats = self.world.get_component(self.monster_id, "Stats")
-        monster_info = self.world.get_component(self.monster_id, "Info")
+        player_stats = self.player_stats
+        monster_stats = self.monster_stats
+        monster_info = self.monster_info
         
         if monster_stats.current_hp > 0:
-            roll = d100()
-            if roll <= monster_stats.av:
-                damage = random.randint(1, 6) + monster_stats.damage_mod - player_stats.defense
-                damage = max(0, damage)
+            hit, damage, roll = roll_attack(monster_stats.av, monster_stats.damage_mod, player_stats.defense)
+            if hit:
                 player_stats.current_hp -= damage
-                self.combat_log.append(f"{monster_info.name} hits Player for {damage} damage! (Rolled {roll})")
+                self.add_log(f"{monster_info.name} hits Player for {damage} damage! (Rolled {roll})")
             else:
-                self.combat_log.append(f"{monster_info.name} misses! (Rolled {roll})")
+                self.add_log(f"{monster_info.name} misses! (Rolled {roll})")
 
     def resolve_combat_round(self):
-        self.combat_log.clear()
-        player_stats = self.world.get_component(self.player_id, "Stats")
-        monster_stats = self.world.get_component(self.monster_id, "Stats")
-        monster_info = self.world.get_component(self.monster_id, "Info")
+        self.clear_log()
+        player_stats = self.player_stats
+        monster_stats = self.monster_stats
+        monster_info = self.monster_info
+
+        if self.player_action == 'Flee':
+            self.add_log("Fleeing not yet implemented. You attack instead.")
+            self.player_action = 'Attack'
 
         if self.player_action == 'Attack':
-            roll = d100()
+            hit, damage, roll = roll_attack(player_stats.adj_str, player_stats.damage_mod, monster_stats.defense)
             if roll <= 10: award_experience(self.world, self.player_id, 'str', 1)
-            if roll <= player_stats.adj_str:
-                damage = random.randint(1, 6) + player_stats.damage_mod - monster_stats.defense
-                damage = max(0, damage)
+            if hit:
                 monster_stats.current_hp -= damage
-                self.combat_log.append(f"Player hits {monster_info.name} for {damage} damage! (Rolled {roll})")
+                self.add_log(f"Player hits {monster_info.name} for {damage} damage! (Rolled {roll})")
             else:
-                self.combat_log.append(f"Player misses! (Rolled {roll})")
-        elif self.player_action == 'Flee':
-            self.combat_log.append("Fleeing not yet implemented. You attack instead.")
-            self.player_action = 'Attack'
-            self.resolve_combat_round()
-            return
+                self.add_log(f"Player misses! (Rolled {roll})")
 
         self.monster_turn()
 
@@ -307,75 +302,87 @@ class CombatScreen(BaseState):
         loot_map = {'A': 'armor', 'I': 'items', 'W': 'weapons', 'P': 'parts'}
         category = loot_map.get(table_key)
         if not category: return
-        player_inventory = self.world.get_component(self.player_id, "Inventory")
-        for _ in range(num_rolls):
-            if category in self.game.items_data and self.game.items_data[category]:
-                item_key = random.choice(list(self.game.items_data[category].keys()))
-                item_data = self.game.items_data[category][item_key]
-                item_id = self.world.create_entity()
-                self.world.add_component(item_id, Item(name=item_data['name'], value=item_data['value'], slot=item_data['slot'], bonuses=item_data.get('bonuses', {})))
-                player_inventory.items.append(item_id)
-                self.combat_log.append(f"You found: {item_data['name']}!")
+        item_keys = self.game.item_keys.get(category)
+        if not item_keys: return
+        category_data = self.game.items_data[category]
+        player_inventory = self.inventory
+        # Draw every roll in one call rather than one random.choice per roll
+        for item_key in random.choices(item_keys, k=num_rolls):
+            item_data = category_data[item_key]
+            item_id = self.world.create_entity(Item(name=item_data['name'], value=item_data['value'], slot=item_data['slot'], bonuses=item_data.get('bonuses', {}),
+                                                    effect=item_data.get('effect'), effect_value=item_data.get('effect_value')))
+            player_inventory.add(item_id)
+            self.add_log(f"You found: {item_data['name']}!")
 
     def check_for_end_of_combat(self):
-        player_stats = self.world.get_component(self.player_id, "Stats")
-        player_info = self.world.get_component(self.player_id, "Info")
-        monster_stats = self.world.get_component(self.monster_id, "Stats")
+        player_stats = self.player_stats
+        player_info = self.player_info
 
-        if monster_stats.current_hp <= 0:
+        if self.monster_stats.current_hp <= 0:
             self.is_combat_over = True
-            monster_info = self.world.get_component(self.monster_id, "Info")
-            self.combat_log.append(f"{monster_info.name} defeated!")
+            self.add_log(f"{self.monster_info.name} defeated!")
             self.generate_loot()
             
             if self.area:
                 self.area.type = 'Yellow'
                 self.area.color = YELLOW
-                # Find the gameplay screen in the state stack
-                from gameplay_states import GameplayScreen
-                for state in reversed(self.game.states):
-                    if isinstance(state, GameplayScreen):
-                        state.message_log.add_message("The area is now clear.", GREEN)
-                        break
-
-            self.combat_log.append("Press any key to continue.")
+                if self.parent_gameplay:
+                    self.parent_gameplay.message_log.add_message("The area is now clear.", GREEN)
+
+            self.add_log("Press any key to continue.")
             self.world.remove_entity(self.monster_id)
+            # The monster's ID goes back to the world's free list, so drop every reference to it
+            self.monster_id = self.monster_stats = self.monster_info = None
         elif player_stats.current_hp <= 0:
             player_info.life_points -= 1
             if player_info.life_points >= 0:
                 player_stats.current_hp = player_stats.max_hp
-                self.combat_log.append(f"You have fallen, but a Life Point saves you! ({player_info.life_points} left)")
+                self.add_log(f"You have fallen, but a Life Point saves you! ({player_info.life_points} left)")
             else:
                 from menu_states import GameOverScreen
                 self.game.change_state(GameOverScreen(self.game))
                 
+    def add_log(self, message):
+        self.combat_log.append(message)
+        self.log_surface = None
+
+    def clear_log(self):
+        self.combat_log.clear()
+        self.log_surface = None
+
+    def render_log(self, width):
+        """Renders every log line onto one surface so a stable log costs a single blit per frame."""
+        surface = pygame.Surface((width, len(self.combat_log) * 30))
+        surface.fill(BLACK)
+        surface.set_colorkey(BLACK)
+        for i, msg in enumerate(self.combat_log):
+            text_surface = render_text(self.log_font, msg, WHITE)
+            surface.blit(text_surface, text_surface.get_rect(center=(width // 2, i * 30 + 15)))
+        return surface
+
     def draw(self, screen):
         screen.fill(BLACK)
-        player_stats = self.world.get_component(self.player_id, "Stats")
-        player_info = self.world.get_component(self.player_id, "Info")
-        monster_exists = self.monster_id in self.world.entities
-        if monster_exists:
-            monster_stats = self.world.get_component(self.monster_id, "Stats")
-            monster_info = self.world.get_component(self.monster_id, "Info")
+        player_stats = self.player_stats
+        player_info = self.player_info
+        monster_stats = self.monster_stats
+        monster_info = self.monster_info
 
         # Draw player info
         draw_text(screen, player_info.name, 150, 100, self.font, WHITE, center=True)
-        hp_text_p = f"HP: {player_stats.current_hp} / {player_stats.max_hp}"
-        hp_color_p = GREEN if player_stats.current_hp/player_stats.max_hp > 0.5 else YELLOW if player_stats.current_hp/player_stats.max_hp > 0.2 else RED
+        hp_text_p, hp_color_p = hp_line(player_stats.current_hp, player_stats.max_hp)
         draw_text(screen, hp_text_p, 150, 140, self.font, hp_color_p, center=True)
         draw_text(screen, f"Lives: {player_info.life_points}", 150, 180, self.font, WHITE, center=True)
 
         # Draw monster info
-        if monster_exists and monster_stats:
+        if monster_stats:
             draw_text(screen, monster_info.name, screen.get_width() - 150, 100, self.font, WHITE, center=True)
-            hp_text_m = f"HP: {monster_stats.current_hp} / {monster_stats.max_hp}"
-            hp_color_m = GREEN if monster_stats.current_hp/monster_stats.max_hp > 0.5 else YELLOW if monster_stats.current_hp/monster_stats.max_hp > 0.2 else RED
+            hp_text_m, hp_color_m = hp_line(monster_stats.current_hp, monster_stats.max_hp)
             draw_text(screen, hp_text_m, screen.get_width() - 150, 140, self.font, hp_color_m, center=True)
 
         # Draw combat log
-        log_y = screen.get_height() - (len(self.combat_log) * 30) - 200
-        for i, msg in enumerate(self.combat_log):
-            draw_text(screen, msg, screen.get_width()//2, log_y + i * 30, self.log_font, WHITE, center=True)
+        if self.log_surface is None or self.log_surface.get_width() != screen.get_width():
+            self.log_surface = self.render_log(screen.get_width())
+        screen.blit(self.log_surface, (0, screen.get_height() - self.log_surface.get_height() - 215))
 
         # Draw menus
         if not self.is_combat_over:
@@ -386,10 +393,10 @@ class CombatScreen(BaseState):
 
     def draw_main_menu(self, screen):
         """Draw the main combat action menu."""
-        menu_y = screen.get_height() - 120
-        for i, option in enumerate(self.menu_options):
-            color = YELLOW if i == self.selected_index else WHITE
-            draw_text(screen, option, screen.get_width()//2, menu_y + i * 25, self.font, color, center=True)
+        menu_x, menu_y = screen.get_width()//2, screen.get_height() - 120
+        for i, (normal_surface, selected_surface) in enumerate(self.menu_surfaces):
+            text_surface = selected_surface if i == self.selected_index else normal_surface
+            screen.blit(text_surface, text_surface.get_rect(center=(menu_x, menu_y + i * 25)))
 
     def draw_submenu(self, screen):
         """Draw the current submenu."""
@@ -399,8 +406,8 @@ class CombatScreen(BaseState):
         pygame.draw.rect(screen, WHITE, menu_bg, 2)
         
         # Draw title
-        title = f"{self.current_submenu.title()} Actions"
-        draw_text(screen, title, screen.get_width()//2, menu_bg.y + 20, self.font, YELLOW, center=True)
+        title_surface = self.submenu_title_surfaces[self.current_submenu]
+        screen.blit(title_surface, title_surface.get_rect(center=(menu_bg.centerx, menu_bg.y + 20)))
         
         # Draw items
         start_y = menu_bg.y + 60
@@ -409,4 +416,4 @@ class CombatScreen(BaseState):
             draw_text(screen, item['name'], screen.get_width()//2, start_y + i * 25, self.small_font, color, center=True)
         
         # Draw instructions
-        draw_text(screen, "Enter: Select | Escape: Back", screen.get_width()//2, menu_bg.bottom - 30, self.small_font, GREY, center=True)
\ No newline at end of file
+        screen.blit(self.submenu_hint_surface, self.submenu_hint_surface.get_rect(center=(menu_bg.centerx, menu_bg.bottom - 30)))
\ No newline at end of file
@@ -2,8 +2,32 @@
 # This file contains all the component classes for the ECS.
 # Components are simple data containers.
 
+from collections import deque
+from enum import IntEnum
+
+class Slot(IntEnum):
+    """Equipment slots, used as indices into Equipment.slots."""
+    HEAD = 0
+    TORSO = 1
+    MAIN_HAND = 2
+    OFF_HAND = 3
+    BACK = 4
+    ARMS = 5
+    HANDS = 6
+    WAIST = 7
+    LEGS = 8
+    FEET = 9
+    NECK = 10
+    RING1 = 11
+    RING2 = 12
+
+# Maps the slot names used in items.json (e.g. "main_hand") to their Slot
+SLOT_BY_NAME = {slot.name.lower(): slot for slot in Slot}
+SLOT_BY_NAME['two_hand'] = Slot.MAIN_HAND  # Two-handed weapons are held in the main hand and free the off hand
+
 class Position:
     """Represents an entity's position, including world and local coordinates."""
+    __slots__ = ('world_x', 'world_y', 'local_x', 'local_y')
     def __init__(self, world_x, world_y, local_x, local_y):
         self.world_x = world_x
         self.world_y = world_y
@@ -12,19 +36,23 @@ class Position:
 
 class Renderable:
     """Gives an entity a character and color for drawing."""
+    __slots__ = ('char', 'color')
     def __init__(self, char, color):
         self.char, self.color = char, color
 
 class Player:
     """A tag component to identify the player entity."""
-    pass
+    __slots__ = ()
 
 class Combatant:
     """A tag component for any entity that can participate in combat."""
-    pass
+    __slots__ = ()
 
 class Stats:
     """Holds all numerical combat and progression stats for an entity."""
+    __slots__ = ('primary_str', 'primary_dex', 'primary_int', 'primary_hp',
+                 'adj_str', 'adj_dex', 'adj_int', 'max_hp', 'current_hp',
+                 'av', 'defense', 'damage_mod', 'equipment_bonuses', 'xp_pips', 'attuned_stats')
     def __init__(self, strength, dexterity, intelligence, hp, av=0, defense=0, damage_mod=0):
         self.primary_str = strength
         self.primary_dex = dexterity
@@ -41,16 +69,21 @@ class Stats:
         self.av = av 
         self.defense = defense
         self.damage_mod = damage_mod
+
+        # Running totals of the bonuses from equipped items, keyed like items.json "bonuses"
+        self.equipment_bonuses = {"str": 0, "dex": 0, "int": 0, "hp": 0, "def": 0, "dmg": 0}
         
+        # One byte per pip box; tracks always fill from the left
         self.xp_pips = {
-            "str": [0] * 10,
-            "dex": [0] * 10,
-            "int": [0] * 10
+            "str": bytearray(10),
+            "dex": bytearray(10),
+            "int": bytearray(10)
         }
         self.attuned_stats = []
 
 class Info:
     """Holds non-stat information about an entity (names, types, etc.)."""
+    __slots__ = ('name', 'race', 'hero_path', 'life_points', 'rep', 'fate')
     def __init__(self, name, race=None, hero_path=None, life_points=3, rep=1, fate=3):
         self.name = name
         self.race = race
@@ -59,39 +92,74 @@ class Info:
         self.rep = rep
         self.fate = fate
 
+# Belt-menu hint for each consumable effect; effects without an entry show no hint
+EFFECT_HINTS = {
+    'heal': " (Heal {} HP)",
+    'add_oil': " (+{} Oil)",
+    'add_food': " (+{} Food)",
+}
+
+# Amount each effect gives when the item data doesn't set an effect_value
+EFFECT_DEFAULTS = {'heal': 4, 'add_oil': 1, 'add_food': 1}
+
 class Item:
     """Component for items with stats and properties."""
-    def __init__(self, name, value, slot, bonuses):
+    __slots__ = ('name', 'value', 'slot', 'slot_id', 'bonuses', 'effect', 'effect_value', 'display_name')
+    def __init__(self, name, value, slot, bonuses, effect=None, effect_value=None):
         self.name = name
         self.value = value
         self.slot = slot
+        self.slot_id = SLOT_BY_NAME.get(slot)  # None for items that can't be equipped
         self.bonuses = bonuses
+        self.effect = effect  # None for items with no use effect
+        if effect_value is None:
+            effect_value = EFFECT_DEFAULTS.get(effect, 0)
+        self.effect_value = effect_value
+        hint = EFFECT_HINTS.get(effect)
+        self.display_name = name + hint.format(effect_value) if hint else name
 
 class Inventory:
-    """Component to hold a list of item entity IDs."""
+    """Component to hold item entity IDs in the order they were added."""
+    __slots__ = ('_items',)
     def __init__(self):
-        self.items = []
+        self._items = {}  # item entity ID -> None; a dict is an insertion-ordered set with O(1) removal
+
+    def add(self, item_id):
+        """Add an item to the end of the inventory."""
+        self._items[item_id] = None
+
+    def remove(self, item_id):
+        """Remove an item in O(1); the rest keep their order."""
+        del self._items[item_id]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
 
 class Equipment:
     """Component to manage equipped items in their designated slots."""
+    __slots__ = ('slots',)
     def __init__(self):
-        self.slots = {
-            "head": None, "torso": None, "main_hand": None, "off_hand": None,
-            "back": None, "arms": None, "hands": None, "waist": None,
-            "legs": None, "feet": None, "neck": None, "ring1": None, "ring2": None
-        }
+        self.slots = [None] * len(Slot)  # Item entity ID per slot, indexed by Slot
 
 class Skills:
-    """Holds all skills and their progression for an entity."""
+    """Holds all skills and their progression for an entity, one table per field keyed by skill name."""
+    __slots__ = ('bonuses', 'xp_pips', 'attuned')
     def __init__(self):
         skill_names = [
             'Agility', 'Aware', 'Bravery', 'Dodge', 'Escape', 'Locks', 
             'Lucky', 'Magic', 'Strong', 'Traps'
         ]
-        self.skills = {s: {'bonus': 0, 'xp_pips': [0]*10, 'attuned': False} for s in skill_names}
+        self.bonuses = dict.fromkeys(skill_names, 0)
+        # One byte per pip box, like Stats.xp_pips
+        self.xp_pips = {s: bytearray(10) for s in skill_names}
+        self.attuned = set()
 
 class SpellBook:
     """Component to track known spells for spell casters."""
+    __slots__ = ('spells', 'is_unlocked')
     def __init__(self):
         self.spells = []  # List of spell dictionaries
         self.is_unlocked = False  # Unlocked when Int >= 50
@@ -111,26 +179,37 @@ class SpellBook:
 
 class TimeManager:
     """A component for the game manager entity to track in-game time."""
+    __slots__ = ('ticks', 'time_track_markers')
     def __init__(self):
         self.ticks = 0
-        self.time_track_markers = {
+        # Flat track indexed by tick; None means nothing happens on that tick
+        self.time_track_markers = [None] * 37
+        for tick, event in {
             3: 'oil', 6: 'food', 9: 'monster', 12: 'oil', 15: 'food', 18: 'monster',
             21: 'oil', 24: 'food', 27: 'monster', 30: 'oil', 33: 'food', 36: 'end'
-        }
+        }.items():
+            self.time_track_markers[tick] = event
+
+    def event_at(self, tick):
+        """Returns the marker on the given tick, or None past the end of the track."""
+        markers = self.time_track_markers
+        return markers[tick] if tick < len(markers) else None
 
 class MessageLog:
     """A component for the game manager to store and manage game messages."""
+    __slots__ = ('messages', 'max_lines', 'version')
     def __init__(self, max_lines=5):
-        self.messages = []
+        self.messages = deque(maxlen=max_lines)  # Oldest line drops off automatically once full
         self.max_lines = max_lines
+        self.version = 0  # Bumped on every change so views can tell when to re-render
 
     def add_message(self, text, color):
-        if len(self.messages) >= self.max_lines:
-            self.messages.pop(0)
         self.messages.append((text, color))
+        self.version += 1
 
 class Resources:
     """A component for the player to track consumable items."""
+    __slots__ = ('oil', 'food', 'picks', 'key_pips', 'lever_pips')
     def __init__(self, oil=20, food=10, picks=15):
         self.oil = oil
         self.food = food
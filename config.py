@@ -7,6 +7,8 @@ import pygame
 FONT_NAME = "JetBrainsMonoNerdFontMono-Regular.ttf"
 FONT_SIZE = 16
 UI_FONT_SIZE = 18
+FPS = 60
+MENU_FPS = 30  # Frame cap for menu and overlay states, which have nothing to animate
 
 # --- DISPLAY SETTINGS ---
 # The size of the visible game grid in characters
@@ -2,68 +2,96 @@
 # This file contains classes related to the dungeon map structure and generation.
 
 import random
-from tables import MAPPING_TABLE, DOOR_TABLE
-from room_templates import TEMPLATES, WALKABLE_TILES
+from bisect import bisect_left
+from tables import MAPPING_TABLE, DOOR_TABLE, MAPPING_KEYS, DOOR_KEYS
+from room_templates import ROOM_TYPES, WALKABLE_TILES, TEMPLATES_BY_EXIT, NON_START_TEMPLATE_KEYS
 from config import YELLOW, RED, GREEN, BLUE, GREY
 
-def d100():
-    """Helper function for dice rolls."""
-    return random.randint(1, 100)
+# Neighbour offset for each layout side, in MAPPING_TABLE order [Top, Right, Bottom, Left]
+_EXIT_DIRS = ((0, -1), (1, 0), (0, 1), (-1, 0))
 
-class Door:
-    """Represents a door with its properties."""
+# Directions of the 'D' sides of each MAPPING_TABLE layout, so generation only visits real doors
+_DOOR_SIDES = {key: tuple(direction for direction, exit_type in zip(_EXIT_DIRS, area_data['layout']) if exit_type == 'D')
+               for key, area_data in MAPPING_TABLE.items()}
+
+# Size of the square world-space cells used to find the areas covering a tile
+_BUCKET_SIZE = 16
+
+# Display color for each area type; unknown types draw grey
+_COLOR_MAP = {'Yellow': YELLOW, 'Red': RED, 'Green': GREEN, 'Blue': BLUE}
+
+def closest_key(keys, roll):
+    """Returns the entry of the sorted keys nearest to roll, preferring the lower one on a tie."""
+    i = bisect_left(keys, roll)
+    if i == 0:
+        return keys[0]
+    if i == len(keys):
+        return keys[-1]
+    below, above = keys[i - 1], keys[i]
+    return below if roll - below <= above - roll else above
+
+class DoorKind:
+    """The fixed properties of one DOOR_TABLE entry, shared by every door rolled from it."""
+    __slots__ = ('type', 'code', 'test', 'mod', 'skills')
     def __init__(self, door_data):
         self.type = door_data['type']
         self.code = door_data['code']
         self.test = door_data['test']
         self.mod = door_data['mod']
         self.skills = door_data['skills']
+
+DOOR_KINDS = {roll: DoorKind(door_data) for roll, door_data in DOOR_TABLE.items()}
+
+class Door:
+    """Represents a door: its shared DoorKind plus whether it has been opened."""
+    __slots__ = ('kind', 'is_open')
+    def __init__(self, kind):
+        self.kind = kind
         self.is_open = False
 
 class Area:
     """Represents a single area (room/corridor) in the dungeon."""
-    def __init__(self, x, y, area_data, template):
+    __slots__ = ('x', 'y', 'type', 'layout', 'color', 'has_been_searched', 'feature', 'doors',
+                 'door_rolls', 'room_type', 'world_offset_x', 'world_offset_y')
+    def __init__(self, x, y, area_data, room_type):
         self.x = x
         self.y = y
         self.type = area_data['type']
         self.layout = area_data['layout']
-        self.color = {'Yellow': YELLOW, 'Red': RED, 'Green': GREEN, 'Blue': BLUE}.get(self.type, GREY)
+        self.color = _COLOR_MAP.get(self.type, GREY)
         self.has_been_searched = False
         self.feature = None
-        self.doors = {} 
-        self.template = template
-        self.room_data = self.template['map']
-        
-        # Store actual world position for each tile
-        self.world_tiles = {}
-        self._calculate_world_positions()
-    
-    def _calculate_world_positions(self):
-        """Calculate the world coordinates for each tile in this room."""
-        room_width = len(self.room_data[0])
-        room_height = len(self.room_data)
-        
-        # Calculate world offset for this room (rooms overlap by 1 tile at doors)
-        world_offset_x = self.x * (room_width - 1)
-        world_offset_y = self.y * (room_height - 1)
+        self.doors = {}       # direction -> Door, built on first access by get_door
+        self.door_rolls = {}  # direction -> d100 roll for each door side
+        self.room_type = room_type
         
-        for local_y, row in enumerate(self.room_data):
-            for local_x, char in enumerate(row):
-                world_x = world_offset_x + local_x
-                world_y = world_offset_y + local_y
-                self.world_tiles[(world_x, world_y)] = {
-                    'char': char,
-                    'local_pos': (local_x, local_y),
-                    'room_coords': (self.x, self.y)
-                }
+        # World position of the room's top-left tile (rooms overlap by 1 tile at doors)
+        self.world_offset_x = self.x * (room_type.width - 1)
+        self.world_offset_y = self.y * (room_type.height - 1)
+
+    def get_door(self, direction):
+        """Returns the Door on the given side, creating it from its roll the first time; None if there is no door."""
+        door = self.doors.get(direction)
+        if door is None and direction in self.door_rolls:
+            door = self.doors[direction] = Door(DOOR_KINDS[closest_key(DOOR_KEYS, self.door_rolls[direction])])
+        return door
 
 class DungeonMap:
     """Manages the collection of all discovered areas and procedural generation."""
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Private generator so a seed reproduces the same dungeon regardless of other random calls
+        self._rng = random.Random(seed)
+        self._random = self._rng.random
         self.areas = {}
-        self.world_tiles = {}  # Global tile map for rendering
+        # Coarse spatial index: bucket -> areas overlapping it, in generation order
+        self.area_buckets = {}
+        self._bounds = None  # (min_x, min_y, max_x, max_y) over all areas, grown as areas are added
         self.generate_area(0, 0, is_entrance=True)
 
+    def d100(self):
+        """Rolls a d100 from the dungeon's generator; skips randint's argument checks since this runs per area and door."""
+        return int(self._random() * 100) + 1
+
     def get_area(self, x, y):
         """Safely retrieves an area at given coordinates, returning None if it doesn't exist."""
         return self.areas.get((x, y))
@@ -76,70 +104,116 @@ class DungeonMap:
             return self.areas[(x, y)]
 
         if is_entrance:
-            area_data = MAPPING_TABLE['entrance']
-            template = TEMPLATES['start_room']
+            area_key = 'entrance'
+            room_type = ROOM_TYPES['start_room']
         else:
-            roll = d100()
-            valid_keys = [k for k in MAPPING_TABLE.keys() if isinstance(k, int)]
-            closest_roll = min(valid_keys, key=lambda k: abs(k - roll))
-            area_data = MAPPING_TABLE[closest_roll]
+            roll = self.d100()
+            area_key = closest_key(MAPPING_KEYS, roll)
             
-            # Filter templates to find ones with the required connecting exit
-            possible_templates = []
-            if required_exit:
-                for key, tmpl in TEMPLATES.items():
-                    if key != 'start_room' and required_exit in tmpl['exits']:
-                        possible_templates.append(key)
+            # Pick from the templates with the required connecting exit
+            possible_templates = TEMPLATES_BY_EXIT.get(required_exit)
             
             # If no specific templates are found, fall back to any non-start room
             if not possible_templates:
                 print(f"Warning: No room templates found with a '{required_exit}' exit. Picking a random room.")
-                possible_templates = [k for k in TEMPLATES.keys() if k != 'start_room']
+                possible_templates = NON_START_TEMPLATE_KEYS
 
-            template_key = random.choice(possible_templates)
-            template = TEMPLATES[template_key]
+            template_key = self._rng.choice(possible_templates)
+            room_type = ROOM_TYPES[template_key]
         
-        new_area = Area(x, y, area_data, template)
+        new_area = Area(x, y, MAPPING_TABLE[area_key], room_type)
         self.areas[(x, y)] = new_area
         
         # Add this room's tiles to the global world map
         self._add_area_to_world_map(new_area)
         
-        # Generate doors
-        exit_map = {0: (0, -1), 1: (1, 0), 2: (0, 1), 3: (-1, 0)}
-        for i, exit_type in enumerate(new_area.layout):
-            if exit_type == 'D':
-                roll = d100()
-                valid_door_keys = [k for k in DOOR_TABLE.keys() if isinstance(k, int)]
-                closest_door_roll = min(valid_door_keys, key=lambda k: abs(k - roll))
-                door_data = DOOR_TABLE[closest_door_roll]
-                dx, dy = exit_map[i]
-                new_area.doors[(dx, dy)] = Door(door_data)
+        # Roll for doors now, one per door side of the layout; Door objects are built on first visit
+        new_area.door_rolls = {direction: self.d100() for direction in _DOOR_SIDES[area_key]}
         
         return new_area
     
     def _add_area_to_world_map(self, area):
-        """Add an area's tiles to the global world tile map."""
-        for world_pos, tile_data in area.world_tiles.items():
-            # Only add if not already occupied, or if this is a door connection
-            if world_pos not in self.world_tiles or tile_data['char'] == 'D':
-                self.world_tiles[world_pos] = tile_data
+        """Grow the cached world bounds and register the area in every spatial bucket it overlaps."""
+        min_x, min_y = area.world_offset_x, area.world_offset_y
+        max_x = min_x + area.room_type.span - 1
+        max_y = min_y + area.room_type.height - 1
+        if self._bounds is None:
+            self._bounds = (min_x, min_y, max_x, max_y)
+        else:
+            b_min_x, b_min_y, b_max_x, b_max_y = self._bounds
+            self._bounds = (min(min_x, b_min_x), min(min_y, b_min_y), max(max_x, b_max_x), max(max_y, b_max_y))
+
+        first_bx, first_by = min_x // _BUCKET_SIZE, min_y // _BUCKET_SIZE
+        last_bx, last_by = max_x // _BUCKET_SIZE, max_y // _BUCKET_SIZE
+        for by in range(first_by, last_by + 1):
+            for bx in range(first_bx, last_bx + 1):
+                self.area_buckets.setdefault((bx, by), []).append(area)
     
+    def _tile_owner(self, world_x, world_y):
+        """Returns (area, char) for the area that owns a world tile, or (None, None)."""
+        owner = char = None
+        for area in self.area_buckets.get((world_x // _BUCKET_SIZE, world_y // _BUCKET_SIZE), ()):
+            local_y = world_y - area.world_offset_y
+            room_type = area.room_type
+            if not 0 <= local_y < room_type.height:
+                continue
+            row = room_type.room_data[local_y]
+            local_x = world_x - area.world_offset_x
+            if not 0 <= local_x < len(row):
+                continue
+            # The first area to cover a tile owns it, unless a later area puts a door connection there
+            if owner is None or row[local_x] == 'D':
+                owner, char = area, row[local_x]
+        return owner, char
+    
+    def get_world_row(self, world_x, world_y, width):
+        """Returns the tile characters of width tiles starting at a world position, None where there is no tile.
+
+        Matches get_world_tile for every tile, but copies whole row slices per area instead of
+        resolving tiles one at a time.
+        """
+        tiles = [None] * width
+        end_x = world_x + width
+        by = world_y // _BUCKET_SIZE
+        for bx in range(world_x // _BUCKET_SIZE, (end_x - 1) // _BUCKET_SIZE + 1):
+            areas = self.area_buckets.get((bx, by))
+            if not areas:
+                continue
+            seg_start = max(world_x, bx * _BUCKET_SIZE)
+            seg_end = min(end_x, (bx + 1) * _BUCKET_SIZE)
+            doors = []
+            # Later areas are written first so the first area covering a tile ends up owning it...
+            for area in reversed(areas):
+                local_y = world_y - area.world_offset_y
+                room_type = area.room_type
+                if not 0 <= local_y < room_type.height:
+                    continue
+                row = room_type.room_data[local_y]
+                start = max(seg_start, area.world_offset_x)
+                stop = min(seg_end, area.world_offset_x + len(row))
+                if start < stop:
+                    tiles[start - world_x:stop - world_x] = row[start - area.world_offset_x:stop - area.world_offset_x]
+                    doors.extend(area.world_offset_x + x for x in room_type.door_columns[local_y])
+            # ...except where any covering area puts a door connection
+            for door_x in doors:
+                if seg_start <= door_x < seg_end:
+                    tiles[door_x - world_x] = 'D'
+        return tiles
+
     def get_world_tile(self, world_x, world_y):
         """Get the tile character at world coordinates."""
-        tile_data = self.world_tiles.get((world_x, world_y))
-        return tile_data['char'] if tile_data else None
+        return self._tile_owner(world_x, world_y)[1]
     
     def get_tile_room_coords(self, world_x, world_y):
         """Get the room coordinates for a world tile."""
-        tile_data = self.world_tiles.get((world_x, world_y))
-        return tile_data['room_coords'] if tile_data else None
+        area = self._tile_owner(world_x, world_y)[0]
+        return (area.x, area.y) if area else None
     
     def world_to_local_coords(self, world_x, world_y):
         """Convert world coordinates to room-local coordinates."""
-        tile_data = self.world_tiles.get((world_x, world_y))
-        if tile_data:
-            return tile_data['room_coords'], tile_data['local_pos']
+        area = self._tile_owner(world_x, world_y)[0]
+        if area:
+            return (area.x, area.y), (world_x - area.world_offset_x, world_y - area.world_offset_y)
         return None, None
     
     def local_to_world_coords(self, room_x, room_y, local_x, local_y):
@@ -148,20 +222,8 @@ class DungeonMap:
         if not area:
             return None, None
         
-        room_width = len(area.room_data[0])
-        room_height = len(area.room_data)
-        
-        world_offset_x = room_x * (room_width - 1)
-        world_offset_y = room_y * (room_height - 1)
-        
-        return world_offset_x + local_x, world_offset_y + local_y
+        return area.world_offset_x + local_x, area.world_offset_y + local_y
     
     def get_world_bounds(self):
         """Get the bounds of the current world map."""
-        if not self.world_tiles:
-            return 0, 0, 0, 0
-        
-        x_coords = [pos[0] for pos in self.world_tiles.keys()]
-        y_coords = [pos[1] for pos in self.world_tiles.keys()]
-        
-        return min(x_coords), min(y_coords), max(x_coords), max(y_coords)
\ No newline at end of file
+        return self._bounds or (0, 0, 0, 0)
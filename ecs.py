@@ -1,43 +1,150 @@
 # ecs.py
 # This file contains the core Entity-Component-System World class.
 
+from itertools import chain
+
+class Archetype:
+    """Column storage for every entity that has exactly the same set of component classes."""
+    __slots__ = ('mask', 'entity_ids', 'columns', 'rows')
+    def __init__(self, mask, component_types):
+        self.mask = mask            # OR of the component bits of every class in this archetype
+        self.entity_ids = []
+        self.columns = {component_type: [] for component_type in component_types}
+        self.rows = {}              # entity ID -> row index into entity_ids and every column
+
+    def append(self, entity_id, components):
+        """Adds an entity as a new row; components maps each of this archetype's classes to its instance."""
+        self.rows[entity_id] = len(self.entity_ids)
+        self.entity_ids.append(entity_id)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])
+
+    def remove(self, entity_id):
+        """Removes an entity's row, swapping the last row into the hole so every column stays dense."""
+        row = self.rows.pop(entity_id)
+        last_id = self.entity_ids.pop()
+        moved = last_id != entity_id
+        if moved:
+            self.entity_ids[row] = last_id
+            self.rows[last_id] = row
+        for column in self.columns.values():
+            last = column.pop()
+            if moved:
+                column[row] = last
+
+    def pop(self, entity_id):
+        """Removes an entity's row and returns its components as {class: component}."""
+        row = self.rows[entity_id]
+        components = {component_type: column[row] for component_type, column in self.columns.items()}
+        self.remove(entity_id)
+        return components
+
 class World:
     """Manages all entities, components, and systems."""
     def __init__(self):
-        self.entities = {}
-        self.components = {}
+        self.archetypes = {}        # component bitmask -> Archetype
+        self.entity_archetype = {}  # entity ID -> the Archetype holding its components
+        self.component_bits = {}    # component class -> its single-bit integer ID
+        self.query_cache = {}       # tuple of component classes -> frozenset of matching entity IDs
         self.entity_id_counter = 0
+        self.free_ids = []          # IDs of removed entities, reused before new ones are minted
+        self.empty_archetype = self.archetypes[0] = Archetype(0, ())
+
+    def create_entity(self, *components):
+        """Creates a new entity ID, recycling a removed one when available.
 
-    def create_entity(self):
-        """Creates a new entity ID."""
-        entity_id = self.entity_id_counter
-        self.entities[entity_id] = {}
-        self.entity_id_counter += 1
+        Any components given are stored straight into the archetype for their
+        combined signature, skipping the migration add_component does per component.
+        """
+        if self.free_ids:
+            entity_id = self.free_ids.pop()
+        else:
+            entity_id = self.entity_id_counter
+            self.entity_id_counter += 1
+        archetype = self.empty_archetype
+        components = {type(component): component for component in components}
+        if components:
+            mask = 0
+            for component_type in components:
+                mask |= self.component_bit(component_type)
+            archetype = self.archetypes.get(mask)
+            if archetype is None:
+                archetype = self.archetypes[mask] = Archetype(mask, components)
+            self.query_cache.clear()
+        archetype.append(entity_id, components)
+        self.entity_archetype[entity_id] = archetype
         return entity_id
 
+    def component_bit(self, component_type):
+        """Returns the bit for a component class, assigning the next free one on first use."""
+        bit = self.component_bits.get(component_type)
+        if bit is None:
+            bit = self.component_bits[component_type] = 1 << len(self.component_bits)
+        return bit
+
     def add_component(self, entity_id, component):
-        """Adds a component to a given entity."""
-        component_name = component.__class__.__name__
-        self.entities[entity_id][component_name] = component
-        if component_name not in self.components:
-            self.components[component_name] = set()
-        self.components[component_name].add(entity_id)
-
-    def get_component(self, entity_id, component_name):
-        """Retrieves a component from an entity."""
-        return self.entities.get(entity_id, {}).get(component_name)
-
-    def get_entities_with(self, *component_names):
-        """Returns a set of entity IDs that have all the specified components."""
+        """Adds a component to a given entity, moving it to the archetype for its new signature."""
+        component_type = type(component)
+        archetype = self.entity_archetype[entity_id]
+        column = archetype.columns.get(component_type)
+        if column is not None:
+            column[archetype.rows[entity_id]] = component
+            return
+        components = archetype.pop(entity_id)
+        components[component_type] = component
+        mask = archetype.mask | self.component_bit(component_type)
+        archetype = self.archetypes.get(mask)
+        if archetype is None:
+            archetype = self.archetypes[mask] = Archetype(mask, components)
+        archetype.append(entity_id, components)
+        self.entity_archetype[entity_id] = archetype
+        self.query_cache.clear()
+
+    def get_component(self, entity_id, component_type):
+        """Retrieves a component of the given class from an entity, or None."""
         try:
-            return set.intersection(*(self.components[name] for name in component_names))
-        except (KeyError, TypeError):
-            return set()
-    
+            archetype = self.entity_archetype[entity_id]
+            return archetype.columns[component_type][archetype.rows[entity_id]]
+        except KeyError:
+            return None
+
+    def get_components(self, entity_id, *component_types):
+        """Retrieves several components from an entity at once, as a tuple with None for any it lacks."""
+        archetype = self.entity_archetype.get(entity_id)
+        if archetype is None:
+            return (None,) * len(component_types)
+        row = archetype.rows[entity_id]
+        columns = archetype.columns
+        return tuple(columns[component_type][row] if component_type in columns else None
+                     for component_type in component_types)
+
+    def get_entities_with(self, *component_types):
+        """Returns a set of entity IDs that have all the specified components.
+
+        Matching archetypes contribute their whole entity list; results are cached
+        per query until an entity changes archetype or is removed.
+        """
+        result = self.query_cache.get(component_types)
+        if result is None:
+            query = 0
+            for component_type in component_types:
+                bit = self.component_bits.get(component_type)
+                if bit is None:
+                    query = 0  # Nothing has an unregistered component
+                    break
+                query |= bit
+            if query:
+                result = frozenset(chain.from_iterable(archetype.entity_ids for archetype in self.archetypes.values()
+                                                       if archetype.mask & query == query))
+            else:
+                result = frozenset()
+            self.query_cache[component_types] = result
+        return result
+
     def remove_entity(self, entity_id):
         """Removes an entity and all its components from the world."""
-        if entity_id in self.entities:
-            for component_name in list(self.entities[entity_id]):
-                if component_name in self.components:
-                    self.components[component_name].discard(entity_id)
-            del self.entities[entity_id]
+        archetype = self.entity_archetype.pop(entity_id, None)
+        if archetype is not None:
+            archetype.remove(entity_id)
+            self.free_ids.append(entity_id)
+            self.query_cache.clear()
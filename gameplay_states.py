@@ -8,49 +8,81 @@ from ecs import World
 from components import *
 from systems import *
 from dungeon import DungeonMap
-from room_templates import WALKABLE_TILES
-from menu_states import BaseState
+from room_templates import TILE_CHARS
+from menu_states import BaseState, PATH_BONUS_SKILLS, RACE_BONUS_SKILLS
+
+# Room-grid offset of each exit direction, and the exit it arrives through on the other side
+EXIT_OFFSETS = {'north': (0, -1), 'south': (0, 1), 'east': (1, 0), 'west': (-1, 0)}
+OPPOSITE_EXIT = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
+# Local-tile step for each movement key
+MOVE_DELTAS = {pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1), pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0)}
+
+def tile_color(char):
+    """Map color for a dungeon tile: walls stand out, floors and other features are dimmed."""
+    return GREY if char == '#' else DARK_GREY
 
 class GameplayScreen(BaseState):
+    target_fps = FPS
     def __init__(self, game):
         super().__init__(game)
         self.world = World()
         self.font = load_font(FONT_NAME, FONT_SIZE)
         self.ui_font = load_font(FONT_NAME, UI_FONT_SIZE)
+
+        # Every map glyph pre-rendered in its map color (a complete char -> surface table, since templates
+        # are fixed), and the pixel position of each grid cell
+        self.char_w, self.char_h = self.font.size(' ')
+        self.tile_glyphs = {char: render_text(self.font, char, tile_color(char)) for char in TILE_CHARS}
+        self.cell_positions = [[(screen_x * self.char_w, screen_y * self.char_h) for screen_x in range(GRID_WIDTH)]
+                               for screen_y in range(GRID_HEIGHT)]
+        # The visible map only changes when the camera moves or a new area appears
+        self.map_surface = None
+        self.map_key = None
+        # Message log composited into one surface, rebuilt when the log's version changes
+        self.log_surface = None
+        self.log_version = None
+        # HP and resource lines, re-formatted only when one of the values they show changes
+        self.status_lines = None
+        self.status_key = None
         
         self.dungeon_map = DungeonMap()
         self.manager_id = self.create_manager()  # Create manager first to initialize message_log
         self.player_id = self.create_player()
+        # The player and manager keep these components for the whole run, so hold them directly
+        self.time_manager = self.world.get_component(self.manager_id, TimeManager)
+        self.player_pos, self.player_render, self.player_stats, self.player_resources = self.world.get_components(
+            self.player_id, Position, Renderable, Stats, Resources)
         self.message_log.add_message("Welcome to the dungeon!", YELLOW)
 
     def auto_equip_starting_gear(self, world, player_id, starting_items):
         """Automatically equip starting weapons and armor."""
-        equipment = world.get_component(player_id, "Equipment")
-        inventory = world.get_component(player_id, "Inventory")
-        resources = world.get_component(player_id, "Resources")
+        equipment, inventory, resources, stats = world.get_components(player_id, Equipment, Inventory, Resources, Stats)
         
         for item_info in starting_items:
-            # Create the item entity
-            item_id = world.create_entity()
             item_data = item_info['data']
             
             # Create the item component
-            world.add_component(item_id, Item(
+            item = Item(
                 name=item_data['name'], 
                 value=item_data['value'], 
                 slot=item_data['slot'], 
-                bonuses=item_data.get('bonuses', {})
-            ))
+                bonuses=item_data.get('bonuses', {}),
+                effect=item_data.get('effect'),
+                effect_value=item_data.get('effect_value')
+            )
+            # Create the item entity
+            item_id = world.create_entity(item)
             
             # Auto-equip weapons and armor, add consumables to inventory
             if item_info['type'] in ['weapon', 'armor']:
-                slot = item_data['slot']
-                if slot in equipment.slots and equipment.slots[slot] is None:
+                slot = item.slot_id
+                if slot is not None and item.slot != 'two_hand' and equipment.slots[slot] is None:
                     equipment.slots[slot] = item_id
+                    apply_item_bonuses(stats, item)
                     print(f"Auto-equipped: {item_data['name']}")
                 else:
                     # If slot is occupied or item is two-handed, add to inventory
-                    inventory.items.append(item_id)
+                    inventory.add(item_id)
             elif item_info['type'] == 'consumable':
                 # Handle consumables - add resources or potions to inventory
                 if 'oil' in item_data['name'].lower():
@@ -61,7 +93,7 @@ class GameplayScreen(BaseState):
                     resources.picks += 1
                 else:
                     # Add potions to inventory
-                    inventory.items.append(item_id)
+                    inventory.add(item_id)
 
     def create_player(self):
         player_id = self.world.create_entity()
@@ -69,7 +101,7 @@ class GameplayScreen(BaseState):
         
         # Player starts in world (0,0) at the designated start pos of the room template
         start_area = self.dungeon_map.get_area(0, 0)
-        start_pos_local = start_area.template.get('start_pos', (1, 1))
+        start_pos_local = start_area.room_type.start_pos
         self.world.add_component(player_id, Position(0, 0, start_pos_local[0], start_pos_local[1]))
 
         self.world.add_component(player_id, Renderable('@', YELLOW))
@@ -88,14 +120,10 @@ class GameplayScreen(BaseState):
         skills_comp = Skills()
         
         path, race = p_data['hero_path'], p_data['race']
-        if path == 'Warrior': skills_comp.skills['Bravery']['bonus'] = 5; skills_comp.skills['Escape']['bonus'] = 5
-        if path == 'Rogue': skills_comp.skills['Locks']['bonus'] = 5; skills_comp.skills['Traps']['bonus'] = 5
-        if path == 'Sorcerer': skills_comp.skills['Magic']['bonus'] = 5; skills_comp.skills['Lucky']['bonus'] = 5
-        if race == 'Dwarf': skills_comp.skills['Strong']['bonus'] = 5
-        if race == 'Elf': skills_comp.skills['Dodge']['bonus'] = 5
-        if race == 'Human': skills_comp.skills['Aware']['bonus'] = 5
+        for skill_name in PATH_BONUS_SKILLS.get(path, frozenset()) | RACE_BONUS_SKILLS.get(race, frozenset()):
+            skills_comp.bonuses[skill_name] = 5
         for skill_name in p_data.get('skills_choice', []):
-            if skill_name in skills_comp.skills: skills_comp.skills[skill_name]['bonus'] += 5
+            if skill_name in skills_comp.bonuses: skills_comp.bonuses[skill_name] += 5
 
         self.world.add_component(player_id, stats_comp)
         self.world.add_component(player_id, skills_comp)
@@ -108,8 +136,7 @@ class GameplayScreen(BaseState):
             
             # Check if spell book should be unlocked
             from spell_system import check_spell_book_unlock, give_sorcerer_starting_spells
-            spell_book = self.world.get_component(player_id, "SpellBook")
-            stats = self.world.get_component(player_id, "Stats")
+            spell_book, stats = self.world.get_components(player_id, SpellBook, Stats)
             
             if stats.adj_int >= 50:
                 spell_book.is_unlocked = True
@@ -122,13 +149,12 @@ class GameplayScreen(BaseState):
                         self.message_log.add_message(f"Starting spells: {', '.join(starting_spells)}", BLUE)
             
             # Log starting equipment
-            equipment = self.world.get_component(player_id, "Equipment")
-            resources = self.world.get_component(player_id, "Resources")
+            equipment, resources = self.world.get_components(player_id, Equipment, Resources)
             equipped_items = []
-            for slot, item_id in equipment.slots.items():
-                if item_id:
-                    item = self.world.get_component(item_id, "Item")
-                    equipped_items.append(f"{item.name} ({slot})")
+            for slot, item_id in zip(Slot, equipment.slots):
+                if item_id is not None:
+                    item = self.world.get_component(item_id, Item)
+                    equipped_items.append(f"{item.name} ({slot.name.lower()})")
             
             if equipped_items:
                 self.message_log.add_message("Starting equipment equipped:", GREEN)
@@ -147,13 +173,13 @@ class GameplayScreen(BaseState):
         return manager_id
 
     def advance_turn(self, ticks=1):
-        time_manager = self.world.get_component(self.manager_id, "TimeManager")
-        resources = self.world.get_component(self.player_id, "Resources")
+        time_manager = self.time_manager
+        resources = self.player_resources
         
         time_manager.ticks += ticks
         self.message_log.add_message(f"Time advances... ({time_manager.ticks})", GREY)
 
-        event = time_manager.time_track_markers.get(time_manager.ticks)
+        event = time_manager.event_at(time_manager.ticks)
         if event == 'oil':
             if resources.oil > 0:
                 resources.oil -= 1
@@ -174,10 +200,10 @@ class GameplayScreen(BaseState):
 
     def handle_events(self, event):
         if event.type == pygame.KEYDOWN:
-            if event.key in [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]:
+            if event.key in MOVE_DELTAS:
                 self.move_player(event.key)
             elif event.key == pygame.K_s:
-                player_pos = self.world.get_component(self.player_id, "Position")
+                player_pos = self.player_pos
                 current_area = self.dungeon_map.get_area(player_pos.world_x, player_pos.world_y)
                 if not current_area.has_been_searched:
                     self.advance_turn(5)
@@ -192,79 +218,103 @@ class GameplayScreen(BaseState):
 
     def move_player(self, key):
         """Handles player movement using the enhanced world coordinate system."""
-        player_pos = self.world.get_component(self.player_id, "Position")
+        player_pos = self.player_pos
         current_area = self.dungeon_map.get_area(player_pos.world_x, player_pos.world_y)
         
-        dx, dy = 0, 0
-        if key == pygame.K_UP: dy = -1
-        elif key == pygame.K_DOWN: dy = 1
-        elif key == pygame.K_LEFT: dx = -1
-        elif key == pygame.K_RIGHT: dx = 1
-
+        dx, dy = MOVE_DELTAS[key]
         new_local_x = player_pos.local_x + dx
         new_local_y = player_pos.local_y + dy
 
-        # Check bounds of current room first
-        if (0 <= new_local_x < len(current_area.room_data[0]) and 
-            0 <= new_local_y < len(current_area.room_data)):
+        # Only walkable tiles of the current room can be entered
+        room_type = current_area.room_type
+        if (new_local_x, new_local_y) in room_type.walkable:
+            # Check if this is an exit to another room
+            exit_direction = room_type.exit_at.get((new_local_x, new_local_y))
             
-            target_tile = current_area.room_data[new_local_y][new_local_x]
-            
-            if target_tile in WALKABLE_TILES:
-                # Check if this is an exit to another room
-                is_exit = False
-                exit_direction = None
-                for direction, coords in current_area.template['exits'].items():
-                    if coords == (new_local_x, new_local_y):
-                        is_exit = True
-                        exit_direction = direction
-                        break
+            if exit_direction:
+                # Moving to another room
+                world_dx, world_dy = EXIT_OFFSETS[exit_direction]
+                player_pos.world_x += world_dx
+                player_pos.world_y += world_dy
                 
-                if is_exit:
-                    # Moving to another room
-                    world_dx, world_dy = {'north':(0,-1), 'south':(0,1), 'east':(1,0), 'west':(-1,0)}[exit_direction]
-                    player_pos.world_x += world_dx
-                    player_pos.world_y += world_dy
-                    
-                    # Generate the new area if it doesn't exist
-                    opposite_dir = {'north':'south', 'south':'north', 'east':'west', 'west':'east'}[exit_direction]
-                    new_area = self.dungeon_map.generate_area(player_pos.world_x, player_pos.world_y, required_exit=opposite_dir)
-                    
-                    # Set player position to the entrance of the new room
-                    entry_coords = new_area.template['exits'][opposite_dir]
-                    player_pos.local_x, player_pos.local_y = entry_coords
-                    
-                    self.message_log.add_message("You enter a new area.", YELLOW)
-                    self.advance_turn()
-                else:
-                    # Normal movement within the room
-                    player_pos.local_x = new_local_x
-                    player_pos.local_y = new_local_y
-                    self.advance_turn()
+                # Generate the new area if it doesn't exist
+                opposite_dir = OPPOSITE_EXIT[exit_direction]
+                new_area = self.dungeon_map.generate_area(player_pos.world_x, player_pos.world_y, required_exit=opposite_dir)
+                
+                # Set player position to the entrance of the new room
+                entry_coords = new_area.room_type.exits[opposite_dir]
+                player_pos.local_x, player_pos.local_y = entry_coords
+                
+                self.message_log.add_message("You enter a new area.", YELLOW)
+                self.advance_turn()
+            else:
+                # Normal movement within the room
+                player_pos.local_x = new_local_x
+                player_pos.local_y = new_local_y
+                self.advance_turn()
 
     def start_combat(self):
-        player_pos = self.world.get_component(self.player_id, "Position")
+        player_pos = self.player_pos
         current_area = self.dungeon_map.get_area(player_pos.world_x, player_pos.world_y)
 
         monster_key = random.choice(list(self.game.monsters_data.keys()))
         m_data = self.game.monsters_data[monster_key]
-        monster_id = self.world.create_entity()
-        self.world.add_component(monster_id, Combatant())
-        self.world.add_component(monster_id, Info(name=m_data['name']))
         hp = m_data['hp'][0] if isinstance(m_data['hp'], list) else m_data['hp']
-        self.world.add_component(monster_id, Stats(0, 0, 0, hp, m_data['av'], m_data['def'], m_data['dmg']))
-        self.world.add_component(monster_id, Renderable(m_data['char'], m_data['color']))
+        monster_id = self.world.create_entity(Combatant(), Info(name=m_data['name']),
+                                              Stats(0, 0, 0, hp, m_data['av'], m_data['def'], m_data['dmg']),
+                                              Renderable(m_data['char'], m_data['color']))
         
         from combat_states import CombatScreen
-        self.game.push_state(CombatScreen(self.game, self.world, self.player_id, monster_id, monster_key, current_area))
+        self.game.push_state(CombatScreen(self.game, self.world, self.player_id, monster_id, monster_key, current_area, parent_gameplay=self))
 
     def update(self): pass
 
+    def render_map(self, cam_world_x, cam_world_y):
+        """Renders the GRID_WIDTH x GRID_HEIGHT view of the world map whose top-left tile is the camera position."""
+        surface = pygame.Surface((GRID_WIDTH * self.char_w, GRID_HEIGHT * self.char_h)).convert()
+        self.draw_map_cells(surface, cam_world_x, cam_world_y, range(GRID_WIDTH), range(GRID_HEIGHT))
+        return surface
+
+    def scroll_map(self, dx, dy, cam_world_x, cam_world_y):
+        """Shifts the cached map view by the camera's move in tiles, drawing only the cells scrolled into view."""
+        surface = self.map_surface
+        surface.scroll(-dx * self.char_w, -dy * self.char_h)
+        if dx:
+            columns = range(GRID_WIDTH - dx, GRID_WIDTH) if dx > 0 else range(-dx)
+            self.draw_map_cells(surface, cam_world_x, cam_world_y, columns, range(GRID_HEIGHT))
+        if dy:
+            rows = range(GRID_HEIGHT - dy, GRID_HEIGHT) if dy > 0 else range(-dy)
+            self.draw_map_cells(surface, cam_world_x, cam_world_y, range(GRID_WIDTH), rows)
+
+    def draw_map_cells(self, surface, cam_world_x, cam_world_y, columns, rows):
+        """Clears a block of grid cells on a map view surface and draws their tiles; columns and rows are ranges."""
+        surface.fill(BLACK, (columns.start * self.char_w, rows.start * self.char_h,
+                             len(columns) * self.char_w, len(rows) * self.char_h))
+        get_world_row = self.dungeon_map.get_world_row
+        tile_glyphs = self.tile_glyphs
+        first_world_x = cam_world_x + columns.start
+        glyph_blits = []
+        for screen_y in rows:
+            row_positions = self.cell_positions[screen_y]
+            for screen_x, char in enumerate(get_world_row(first_world_x, cam_world_y + screen_y, len(columns)), columns.start):
+                if char:
+                    glyph_blits.append((tile_glyphs[char], row_positions[screen_x]))
+        surface.blits(glyph_blits, doreturn=False)
+
+    def render_message_log(self):
+        """Stacks the message log lines, 20px apart, onto one transparent surface."""
+        lines = [render_text(self.ui_font, msg, color) for msg, color in self.message_log.messages]
+        width = max((line.get_width() for line in lines), default=1)
+        height = max((i * 20 + line.get_height() for i, line in enumerate(lines)), default=1)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.blits([(line, (0, i * 20)) for i, line in enumerate(lines)], doreturn=False)
+        return surface
+
     def draw(self, screen):
         """Enhanced draw method that shows multiple connected rooms."""
         screen.fill(BLACK)
-        player_pos = self.world.get_component(self.player_id, "Position")
-        char_w, char_h = self.font.size(' ')
+        player_pos = self.player_pos
+        char_w, char_h = self.char_w, self.char_h
 
         # Calculate player's world position
         player_world_x, player_world_y = self.dungeon_map.local_to_world_coords(
@@ -280,33 +330,39 @@ class GameplayScreen(BaseState):
         cam_world_y = player_world_y - screen_center_y
         
         # Draw all visible tiles from the world map
-        for screen_y in range(GRID_HEIGHT):
-            for screen_x in range(GRID_WIDTH):
-                world_x = cam_world_x + screen_x
-                world_y = cam_world_y + screen_y
-                
-                char = self.dungeon_map.get_world_tile(world_x, world_y)
-                if char:
-                    color = GREY if char == '#' else DARK_GREY
-                    if char in WALKABLE_TILES:
-                        color = DARK_GREY
-                    draw_text(screen, char, screen_x * char_w, screen_y * char_h, self.font, color)
+        map_key = (cam_world_x, cam_world_y, len(self.dungeon_map.areas))
+        if map_key != self.map_key:
+            # Walking within known areas only slides the view, so reuse what's still on screen
+            old_key = self.map_key
+            if (old_key and old_key[2] == map_key[2]
+                    and abs(cam_world_x - old_key[0]) < GRID_WIDTH and abs(cam_world_y - old_key[1]) < GRID_HEIGHT):
+                self.scroll_map(cam_world_x - old_key[0], cam_world_y - old_key[1], cam_world_x, cam_world_y)
+            else:
+                self.map_surface = self.render_map(cam_world_x, cam_world_y)
+            self.map_key = map_key
+        screen.blit(self.map_surface, (0, 0))
         
         # Draw player
-        player_render = self.world.get_component(self.player_id, "Renderable")
+        player_render = self.player_render
         draw_text(screen, player_render.char, screen_center_x * char_w, screen_center_y * char_h, self.font, player_render.color)
         
         # Draw UI elements (messages, stats, etc.)
-        log_y = screen.get_height() - (self.message_log.max_lines * 20) - 10
-        for msg, color in self.message_log.messages:
-            draw_text(screen, msg, 10, log_y, self.ui_font, color)
-            log_y += 20
+        if self.log_version != self.message_log.version:
+            self.log_surface = self.render_message_log()
+            self.log_version = self.message_log.version
+        screen.blit(self.log_surface, (10, screen.get_height() - (self.message_log.max_lines * 20) - 10))
         
-        stats = self.world.get_component(self.player_id, "Stats")
-        resources = self.world.get_component(self.player_id, "Resources")
-        hp_text = f"HP: {stats.current_hp}/{stats.max_hp}"
-        draw_text(screen, hp_text, 10, 10, self.ui_font, GREEN)
-        draw_text(screen, f"Oil: {resources.oil} Food: {resources.food} Picks: {resources.picks}", 10, 35, self.ui_font, ORANGE)
+        stats = self.player_stats
+        resources = self.player_resources
+        status_key = (stats.current_hp, stats.max_hp, resources.oil, resources.food, resources.picks)
+        if status_key != self.status_key:
+            self.status_lines = (
+                render_text(self.ui_font, f"HP: {stats.current_hp}/{stats.max_hp}", GREEN),
+                render_text(self.ui_font, f"Oil: {resources.oil} Food: {resources.food} Picks: {resources.picks}", ORANGE))
+            self.status_key = status_key
+        hp_surface, resources_surface = self.status_lines
+        screen.blit(hp_surface, (10, 10))
+        screen.blit(resources_surface, (10, 35))
 
 class InventoryScreen(BaseState):
     def __init__(self, game, world, player_id):
@@ -318,10 +374,12 @@ class InventoryScreen(BaseState):
         self.inventory_items = []
         self.refresh_lists()
         self.selected_index = 0
+        # Everything shown here only changes on a key press, so the composed screen is reused until then
+        self.frame_surface = None
 
     def refresh_lists(self):
-        inventory_comp = self.world.get_component(self.player_id, "Inventory")
-        self.inventory_items = inventory_comp.items
+        inventory_comp = self.world.get_component(self.player_id, Inventory)
+        self.inventory_items = list(inventory_comp)
 
     def handle_events(self, event):
         if event.type == pygame.KEYDOWN:
@@ -331,89 +389,101 @@ class InventoryScreen(BaseState):
             elif event.key == pygame.K_DOWN:
                  if self.inventory_items: self.selected_index = (self.selected_index + 1) % len(self.inventory_items)
             elif event.key == pygame.K_e: self.equip_item()
+            self.frame_surface = None
 
     def update(self): pass
 
     def equip_item(self):
         if not self.inventory_items: return
         item_id = self.inventory_items[self.selected_index]
-        item = self.world.get_component(item_id, "Item")
-        slot_to_equip = item.slot
-        if slot_to_equip == "junk": return
-        equipment = self.world.get_component(self.player_id, "Equipment")
-        inventory = self.world.get_component(self.player_id, "Inventory")
-        if equipment.slots.get(slot_to_equip) is not None:
-            unequipped_item_id = equipment.slots[slot_to_equip]
-            inventory.items.append(unequipped_item_id)
-        equipment.slots[slot_to_equip] = item_id
-        inventory.items.pop(self.selected_index)
-        update_player_stats(self.world, self.player_id)
+        if self.world.get_component(item_id, Item).slot_id is None: return
+        equip_item(self.world, self.player_id, item_id)
         self.refresh_lists()
         if self.inventory_items and self.selected_index >= len(self.inventory_items):
             self.selected_index = len(self.inventory_items) - 1
 
     def draw(self, screen):
-        screen.fill(BLACK)
-        width, height = screen.get_size()
+        if self.frame_surface is not None and self.frame_surface.get_size() == screen.get_size():
+            screen.blit(self.frame_surface, (0, 0))
+            return []
+        self.frame_surface = self.render_frame(screen.get_size())
+        screen.blit(self.frame_surface, (0, 0))
+        return None
+
+    def render_frame(self, size):
+        """Draws the equipment, character and backpack columns onto a new screen-sized surface."""
+        surface = pygame.Surface(size).convert()
+        surface.fill(BLACK)
+        width, height = size
         col1, col2, col3 = width * 0.05, width * 0.4, width * 0.75
 
-        draw_text(screen, "Equipped", col1, 20, self.header_font, YELLOW)
-        equipment = self.world.get_component(self.player_id, "Equipment")
+        draw_text(surface, "Equipped", col1, 20, self.header_font, YELLOW)
+        equipment = self.world.get_component(self.player_id, Equipment)
         y_pos = 70
-        for slot, item_id in equipment.slots.items():
+        for slot, item_id in zip(Slot, equipment.slots):
             item_name = "Empty"
-            if item_id: item_name = self.world.get_component(item_id, "Item").name
-            draw_text(screen, f"{slot.replace('_', ' ').title():<10}: {item_name}", col1, y_pos, self.font, WHITE)
+            if item_id is not None: item_name = self.world.get_component(item_id, Item).name
+            draw_text(surface, f"{slot.name.replace('_', ' ').title():<10}: {item_name}", col1, y_pos, self.font, WHITE)
             y_pos += 25
 
-        draw_text(screen, "Character", col2, 20, self.header_font, YELLOW)
-        stats = self.world.get_component(self.player_id, "Stats")
-        skills = self.world.get_component(self.player_id, "Skills")
+        draw_text(surface, "Character", col2, 20, self.header_font, YELLOW)
+        stats, skills = self.world.get_components(self.player_id, Stats, Skills)
         y_pos = 70
-        draw_text(screen, f"STR: {stats.primary_str} ({stats.adj_str})", col2, y_pos, self.font, WHITE)
+        draw_text(surface, f"STR: {stats.primary_str} ({stats.adj_str})", col2, y_pos, self.font, WHITE)
         y_pos += 25
-        draw_text(screen, f"DEX: {stats.primary_dex} ({stats.adj_dex})", col2, y_pos, self.font, WHITE)
+        draw_text(surface, f"DEX: {stats.primary_dex} ({stats.adj_dex})", col2, y_pos, self.font, WHITE)
         y_pos += 25
-        draw_text(screen, f"INT: {stats.primary_int} ({stats.adj_int})", col2, y_pos, self.font, WHITE)
+        draw_text(surface, f"INT: {stats.primary_int} ({stats.adj_int})", col2, y_pos, self.font, WHITE)
         y_pos += 40
-        for name, data in skills.skills.items():
-            draw_text(screen, f"{name:<8}: {data['bonus']:>2}", col2, y_pos, self.font, WHITE)
-            for i, pip in enumerate(data['xp_pips']):
+        for name, bonus in skills.bonuses.items():
+            draw_text(surface, f"{name:<8}: {bonus:>2}", col2, y_pos, self.font, WHITE)
+            for i, pip in enumerate(skills.xp_pips[name]):
                 pip_char, pip_color = ('■', BLUE) if pip else ('□', GREY)
-                draw_text(screen, pip_char, col2 + 150 + (i*12), y_pos, self.font, pip_color)
+                draw_text(surface, pip_char, col2 + 150 + (i*12), y_pos, self.font, pip_color)
             y_pos += 25
         
-        draw_text(screen, "Inventory", col3, 20, self.header_font, YELLOW)
+        draw_text(surface, "Inventory", col3, 20, self.header_font, YELLOW)
         y_pos = 70
         if not self.inventory_items:
-            draw_text(screen, "Backpack is empty.", col3, y_pos, self.font, GREY)
+            draw_text(surface, "Backpack is empty.", col3, y_pos, self.font, GREY)
         else:
             for i, item_id in enumerate(self.inventory_items):
-                item = self.world.get_component(item_id, "Item")
+                item = self.world.get_component(item_id, Item)
                 color = YELLOW if i == self.selected_index else WHITE
-                draw_text(screen, item.name, col3, y_pos, self.font, color)
+                draw_text(surface, item.name, col3, y_pos, self.font, color)
                 y_pos += 25
 
-        draw_text(screen, "UP/DOWN: Navigate | E: Equip | ESC: Close", width//2, height - 40, self.font, WHITE, center=True)
+        draw_text(surface, "UP/DOWN: Navigate | E: Equip | ESC: Close", width//2, height - 40, self.font, WHITE, center=True)
+        return surface
 
 class DoorScreen(BaseState):
-    def __init__(self, game, world, player_id, door):
+    def __init__(self, game, world, player_id, door, parent_gameplay=None):
         super().__init__(game)
         self.world = world
         self.player_id = player_id
         self.door = door
+        # The gameplay screen this dialog opens over; found on the state stack if not given
+        if parent_gameplay is None:
+            parent_gameplay = next((state for state in reversed(game.states) if isinstance(state, GameplayScreen)), None)
+        self.parent_gameplay = parent_gameplay
+        self.resources = world.get_component(player_id, Resources)
         self.font = load_font(FONT_NAME, 28)
+        self.overlay = None  # Half-transparent black layer dimming the screen behind the box, built per screen size
+        # The dialog box background and border never change
+        self.box = pygame.Surface((400, 200)).convert()
+        self.box.fill(DARK_GREY)
+        pygame.draw.rect(self.box, WHITE, self.box.get_rect(), 2)
         self.options = self.get_options()
         self.selected_index = 0
 
     def get_options(self):
         options = []
-        if self.door.type in ['Locked', 'Trap Locked']:
+        if self.door.kind.type in ['Locked', 'Trap Locked']:
             options.append("Use Key")
             options.append("Pick Lock")
-        if self.door.type == 'Jammed':
+        if self.door.kind.type == 'Jammed':
             options.append("Force Open")
-        if self.door.type == 'Magic':
+        if self.door.kind.type == 'Magic':
             options.append("Use Magic")
         options.append("Leave")
         return options
@@ -427,25 +497,25 @@ class DoorScreen(BaseState):
 
     def select_option(self):
         option = self.options[self.selected_index]
-        # Find the gameplay screen that's below this door screen
-        gameplay_screen = None
-        for state in reversed(self.game.states):
-            if isinstance(state, GameplayScreen):
-                gameplay_screen = state
-                break
-        
-        if not gameplay_screen:
+        if not self.parent_gameplay:
             self.game.pop_state()
             return
             
-        message_log = self.world.get_component(gameplay_screen.manager_id, "MessageLog")
-        resources = self.world.get_component(self.player_id, "Resources")
+        message_log = self.parent_gameplay.message_log
+        resources = self.resources
 
         if option == "Leave":
             self.game.pop_state()
             return
 
-        success, roll = perform_test(self.world, self.player_id, self.door.test, self.door.mod, self.door.skills)
+        # Without a pick there's nothing to roll for
+        if option == "Pick Lock" and resources.picks <= 0:
+            message_log.add_message("You have no picks left.", ORANGE)
+            self.game.pop_state()
+            return
+
+        kind = self.door.kind
+        success, roll = perform_test(self.world, self.player_id, kind.test, kind.mod, kind.skills)
         
         if success:
             message_log.add_message(f"Success! The door opens. (Rolled {roll})", GREEN)
@@ -453,7 +523,7 @@ class DoorScreen(BaseState):
             self.game.pop_state()
         else:
             message_log.add_message(f"Failure! The door remains shut. (Rolled {roll})", RED)
-            if self.door.type in ['Locked', 'Trap Locked']:
+            if self.door.kind.type in ['Locked', 'Trap Locked']:
                 resources.picks -= 1
                 message_log.add_message("You lost a pick.", ORANGE)
             self.game.pop_state()
@@ -461,18 +531,18 @@ class DoorScreen(BaseState):
     def update(self): pass
 
     def draw(self, screen):
-        s = pygame.Surface(screen.get_size())
-        s.set_alpha(128)
-        s.fill(BLACK)
-        screen.blit(s, (0,0))
+        if self.overlay is None or self.overlay.get_size() != screen.get_size():
+            # Per-pixel alpha baked into the surface, so each blit is a plain alpha blend
+            self.overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            self.overlay.fill((*BLACK, 128))
+        screen.blit(self.overlay, (0,0))
 
         width, height = screen.get_size()
-        box_w, box_h = 400, 200
+        box_w, box_h = self.box.get_size()
         box_x, box_y = (width - box_w)//2, (height - box_h)//2
-        pygame.draw.rect(screen, DARK_GREY, (box_x, box_y, box_w, box_h))
-        pygame.draw.rect(screen, WHITE, (box_x, box_y, box_w, box_h), 2)
+        screen.blit(self.box, (box_x, box_y))
         
-        draw_text(screen, f"{self.door.type} Door", box_x + box_w//2, box_y + 30, self.font, YELLOW, center=True)
+        draw_text(screen, f"{self.door.kind.type} Door", box_x + box_w//2, box_y + 30, self.font, YELLOW, center=True)
         
         for i, option in enumerate(self.options):
             y_pos = box_y + 80 + i * 35
@@ -9,6 +9,7 @@ import json
 from config import *
 # Import from the new modular structure
 from menu_states import TitleScreen
+from systems import render_text
 
 class Game:
     """The main class that runs the game and manages states."""
@@ -19,13 +20,20 @@ class Game:
         self.win_height = 720
         self.screen = pygame.display.set_mode((self.win_width, self.win_height), pygame.RESIZABLE)
         pygame.display.set_caption("D100 ASCII Dungeon")
+        # No state reacts to the mouse or key releases, so keep them out of the event queue
+        pygame.event.set_blocked([pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                                  pygame.MOUSEWHEEL, pygame.KEYUP, pygame.TEXTINPUT])
         self.clock = pygame.time.Clock()
         self.running = True
         self.is_fullscreen = False
+        # State shown by the last full display update; a state's dirty rects are only valid on top of its own frame
+        self.presented_state = None
         
         # Load all game data on initialization
         self.monsters_data = self.load_json_data("monsters.json")
         self.items_data = self.load_json_data("items.json")
+        # Key tuples per item category, so random rolls don't rebuild a list from the dict each time
+        self.item_keys = {category: tuple(items) for category, items in self.items_data.items()}
         self.spells_data = self.load_json_data("spells.json")
         self.player_data = None # Will be created in CharCreationScreen
 
@@ -45,20 +53,38 @@ class Game:
     def run(self):
         """The main game loop."""
         while self.running:
-            for event in pygame.event.get():
+            # Sleep until input arrives (or a frame's worth of time passes) instead of spinning.
+            # A state with nothing new to show and no animation can sleep until the next input.
+            state = self.states[-1]
+            if state.dirty or state.animated or state is not self.presented_state:
+                first_event = pygame.event.wait(1000 // state.target_fps)
+            else:
+                first_event = pygame.event.wait()
+            events = pygame.event.get()
+            if first_event.type != pygame.NOEVENT:
+                events.insert(0, first_event)
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.quit()
+                elif event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                    self.presented_state = None
                 # Pass events to the current state, which is always the last one in the list
                 self.states[-1].handle_events(event)
+                self.states[-1].dirty = True
 
             # Update the current state
             self.states[-1].update()
             
-            # Draw the current state
-            self.states[-1].draw(self.screen)
-            
-            pygame.display.flip()
-            self.clock.tick(60)
+            # Draw the current state, presenting only the areas it reports as changed when it can
+            state = self.states[-1]
+            dirty_rects = state.draw(self.screen)
+            state.dirty = False
+            if dirty_rects is None or state is not self.presented_state:
+                pygame.display.flip()
+                self.presented_state = state
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+            self.clock.tick(state.target_fps)
 
     def change_state(self, new_state):
         """Replaces the entire state stack with a new state."""
@@ -80,6 +106,9 @@ class Game:
             self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         else:
             self.screen = pygame.display.set_mode((self.win_width, self.win_height), pygame.RESIZABLE)
+        # Cached text surfaces were converted for the old display mode
+        render_text.cache_clear()
+        self.presented_state = None
 
     def quit(self):
         """Shuts down the game."""
@@ -3,22 +3,58 @@
 
 import pygame
 import json
+import os
 import random
+import threading
 from config import *
-from systems import load_font, draw_text
+from systems import load_font, draw_text, render_text
+
+# Skills that already get a +5 from the chosen hero path or race, so they can't be picked as bonus skills
+PATH_BONUS_SKILLS = {
+    'Warrior': frozenset(('Bravery', 'Escape')),
+    'Rogue': frozenset(('Locks', 'Traps')),
+    'Sorcerer': frozenset(('Magic', 'Lucky')),
+}
+RACE_BONUS_SKILLS = {
+    'Dwarf': frozenset(('Strong',)),
+    'Elf': frozenset(('Dodge',)),
+    'Human': frozenset(('Aware',)),
+}
 
 class BaseState:
     """A base class for all game states to inherit from."""
+    animated = False  # True for states whose screen changes without input, so the game loop keeps drawing them
+    target_fps = MENU_FPS  # Frame cap the game loop uses while this state is on top
     def __init__(self, game):
         self.game = game
+        self.dirty = True  # Set when the state has something new to draw; the game loop clears it after drawing
     def handle_events(self, event):
         raise NotImplementedError
     def update(self):
         raise NotImplementedError
     def draw(self, screen):
+        """Draws the state. May return the list of rects that changed since the last frame; None means the whole screen."""
         raise NotImplementedError
 
-class TitleScreen(BaseState):
+class MenuSelectionMixin:
+    """Key handling for menu states: Up/Down move selected_index through menu_options, wrapping around."""
+    def init_key_actions(self, on_select):
+        # Key -> handler, so each keypress is a single dict lookup
+        self.key_actions = {pygame.K_UP: self.select_previous, pygame.K_DOWN: self.select_next,
+                            pygame.K_RETURN: on_select, pygame.K_f: self.game.toggle_fullscreen}
+
+    def handle_events(self, event):
+        if event.type == pygame.KEYDOWN and self.menu_options:
+            action = self.key_actions.get(event.key)
+            if action: action()
+
+    def select_previous(self):
+        self.selected_index = (self.selected_index - 1) % len(self.menu_options)
+
+    def select_next(self):
+        self.selected_index = (self.selected_index + 1) % len(self.menu_options)
+
+class TitleScreen(MenuSelectionMixin, BaseState):
     """The main menu screen."""
     def __init__(self, game):
         super().__init__(game)
@@ -26,13 +62,12 @@ class TitleScreen(BaseState):
         self.selected_index = 0
         self.title_font = load_font(FONT_NAME, 100)
         self.menu_font = load_font(FONT_NAME, 50)
-
-    def handle_events(self, event):
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP: self.selected_index = (self.selected_index - 1) % len(self.menu_options)
-            elif event.key == pygame.K_DOWN: self.selected_index = (self.selected_index + 1) % len(self.menu_options)
-            elif event.key == pygame.K_RETURN: self.select_option()
-            elif event.key == pygame.K_f: self.game.toggle_fullscreen()
+        # The title and options never change, so render every label (in both highlight states) up front
+        self.title_surface = render_text(self.title_font, "ASCII RPG", WHITE)
+        self.option_surfaces = [(render_text(self.menu_font, option, WHITE), render_text(self.menu_font, option, YELLOW))
+                                for option in self.menu_options]
+        self.drawn_index = None  # selected_index as of the last frame drawn
+        self.init_key_actions(self.select_option)
 
     def select_option(self):
         from gameplay_states import GameplayScreen
@@ -47,17 +82,36 @@ class TitleScreen(BaseState):
 
     def draw(self, screen):
         screen.fill(BLACK)
-        draw_text(screen, "ASCII RPG", screen.get_width()//2, screen.get_height()//4, self.title_font, WHITE, center=True)
-        for i, option in enumerate(self.menu_options):
+        center_x = screen.get_width() // 2
+        screen.blit(self.title_surface, self.title_surface.get_rect(center=(center_x, screen.get_height() // 4)))
+        option_rects = []
+        for i, (normal_surface, selected_surface) in enumerate(self.option_surfaces):
             y_pos = screen.get_height() // 2 + i * 60
-            color = YELLOW if i == self.selected_index else WHITE
-            draw_text(screen, option, screen.get_width()//2, y_pos, self.menu_font, color, center=True)
+            text_surface = selected_surface if i == self.selected_index else normal_surface
+            option_rects.append(screen.blit(text_surface, text_surface.get_rect(center=(center_x, y_pos))))
+        # Only the highlighted option ever changes on this screen
+        if self.drawn_index == self.selected_index:
+            return []
+        self.drawn_index = self.selected_index
+        return option_rects
+
+def save_player_data(data, path="player.json"):
+    """Writes encoded player data to a temp file and renames it over path, so a partial write never replaces the old save."""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        print(f"Player data saved to {path}")
+    except Exception as e:
+        print(f"Could not save player data: {e}")
 
-class CharCreationScreen(BaseState):
+class CharCreationScreen(MenuSelectionMixin, BaseState):
     def __init__(self, game):
         super().__init__(game)
         self.font = load_font(FONT_NAME, 32)
         self.header_font = load_font(FONT_NAME, 42)
+        self.skill_font = load_font(FONT_NAME, 20)
         self.step = 0
         self.stats = {'Str': 30, 'Dex': 30, 'Int': 30}
         self.points_to_assign = [50, 40, 30]
@@ -67,7 +121,15 @@ class CharCreationScreen(BaseState):
         self.all_skills = ['Agility', 'Aware', 'Bravery', 'Dodge', 'Escape', 'Locks', 'Lucky', 'Magic', 'Strong', 'Traps']
         self.chosen_skills = []
         self.selections = {0: 0, 1: 0, 2: 0, 3:0, 4:0}
-        self.current_selection_index = 0
+        self.selected_index = 0
+        # Options for the current step; only make_selection changes them, so they're rebuilt there
+        self.menu_options = self.get_current_options()
+        self.drawn_key = None  # Selection state as of the last frame drawn
+        self.text_rects = []   # Areas covered by text in the last frame drawn
+        self.drawn_size = None # Screen size as of the last frame drawn
+        self.layout = []       # (surface, rect) of each line of text, from build_layout
+        self.layout_key = None # Screen size and selection state the layout was built for
+        self.init_key_actions(self.make_selection)
 
     def get_current_options(self):
         if self.step == 0: return list(self.stats.keys())
@@ -80,56 +142,41 @@ class CharCreationScreen(BaseState):
         return []
     
     def get_pre_bonus_skills(self):
-        skills_with_bonuses = set()
-        path = self.paths[self.selections[2]]
-        race = self.races[self.selections[1]]
-        if path == 'Warrior': skills_with_bonuses.update(['Bravery', 'Escape'])
-        if path == 'Rogue': skills_with_bonuses.update(['Locks', 'Traps'])
-        if path == 'Sorcerer': skills_with_bonuses.update(['Magic', 'Lucky'])
-        if race == 'Dwarf': skills_with_bonuses.add('Strong')
-        if race == 'Elf': skills_with_bonuses.add('Dodge')
-        if race == 'Human': skills_with_bonuses.add('Aware')
-        return list(skills_with_bonuses)
+        return PATH_BONUS_SKILLS[self.paths[self.selections[2]]] | RACE_BONUS_SKILLS[self.races[self.selections[1]]]
 
     def make_selection(self):
         if self.step == 0:
-            stat_key = self.get_current_options()[self.current_selection_index]
+            stat_key = self.menu_options[self.selected_index]
             if stat_key not in self.assigned_stats:
                 point_val = self.points_to_assign[len(self.assigned_stats)]
                 self.stats[stat_key] = point_val
                 self.assigned_stats.append(stat_key)
                 if len(self.assigned_stats) == len(self.points_to_assign):
-                    self.step += 1; self.current_selection_index = 0
+                    self.step += 1; self.selected_index = 0
         elif self.step == 1:
-            self.selections[1] = self.current_selection_index
-            self.step += 1; self.current_selection_index = 0
+            self.selections[1] = self.selected_index
+            self.step += 1; self.selected_index = 0
         elif self.step == 2:
-            self.selections[2] = self.current_selection_index
-            self.step += 1; self.current_selection_index = 0
+            self.selections[2] = self.selected_index
+            self.step += 1; self.selected_index = 0
         elif self.step == 3:
-            skill_to_add = self.get_current_options()[self.current_selection_index]
+            skill_to_add = self.menu_options[self.selected_index]
             self.chosen_skills.append(skill_to_add)
             if len(self.chosen_skills) == 2:
-                self.step += 1; self.current_selection_index = 0
+                self.step += 1; self.selected_index = 0
         elif self.step == 4:
             self.finish_creation()
-
-    def handle_events(self, event):
-        if event.type == pygame.KEYDOWN:
-            options = self.get_current_options()
-            if not options: return
-            if event.key == pygame.K_UP: self.current_selection_index = (self.current_selection_index - 1) % len(options)
-            elif event.key == pygame.K_DOWN: self.current_selection_index = (self.current_selection_index + 1) % len(options)
-            elif event.key == pygame.K_RETURN: self.make_selection()
-            elif event.key == pygame.K_f: self.game.toggle_fullscreen()
+            return
+        self.menu_options = self.get_current_options()
 
     def generate_starting_equipment(self):
         """Generate starting equipment: 1 weapon and 3 armor pieces, plus consumables."""
         starting_items = []
         
         # Roll once on weapons table (Table W)
-        if 'weapons' in self.game.items_data and self.game.items_data['weapons']:
-            weapon_key = random.choice(list(self.game.items_data['weapons'].keys()))
+        weapon_keys = self.game.item_keys.get('weapons')
+        if weapon_keys:
+            weapon_key = random.choice(weapon_keys)
             weapon_data = self.game.items_data['weapons'][weapon_key]
             starting_items.append({
                 'type': 'weapon',
@@ -138,12 +185,13 @@ class CharCreationScreen(BaseState):
             })
         
         # Roll three times on armor table (Table A)
+        armor_keys = self.game.item_keys.get('armor')
         equipped_slots = set()
         for _ in range(3):
             attempts = 0
             while attempts < 10:  # Prevent infinite loop
-                if 'armor' in self.game.items_data and self.game.items_data['armor']:
-                    armor_key = random.choice(list(self.game.items_data['armor'].keys()))
+                if armor_keys:
+                    armor_key = random.choice(armor_keys)
                     armor_data = self.game.items_data['armor'][armor_key]
                     
                     # Check if we already have armor for this slot
@@ -202,68 +250,100 @@ class CharCreationScreen(BaseState):
             "skills_choice": self.chosen_skills,
             "starting_equipment": starting_equipment  # Store for use in GameplayScreen
         }
-        try:
-            with open("player.json", "w") as f:
-                json.dump(self.game.player_data, f, indent=4)
-            print("Player data saved to player.json")
-        except Exception as e:
-            print(f"Could not save player data: {e}")
+        # Serialize now so the saved snapshot can't change under the writer, then write off the main thread.
+        # The thread is not a daemon, so quitting waits for the write to finish instead of cutting it off.
+        data = json.dumps(self.game.player_data, separators=(',', ':')).encode()
+        threading.Thread(target=save_player_data, args=(data,)).start()
         
         from gameplay_states import GameplayScreen
         self.game.change_state(GameplayScreen(self.game))
 
     def update(self): pass
 
-    def draw(self, screen):
-        screen.fill(BLACK)
-        w, h = screen.get_size()
-        draw_text(screen, "Create Your Adventurer", w//2, 50, self.header_font, WHITE, center=True)
+    def build_layout(self, w, h):
+        """Returns the (surface, rect) of every line of text for the current selection state and screen size."""
+        lines = []  # (text, center y, font, color)
+        lines.append(("Create Your Adventurer", 50, self.header_font, WHITE))
         
         y_pos = 120
-        draw_text(screen, "1. Characteristics", w//2, y_pos, self.font, GREY if self.step > 0 else WHITE, center=True)
+        lines.append(("1. Characteristics", y_pos, self.font, GREY if self.step > 0 else WHITE))
         points_left = len(self.points_to_assign) - len(self.assigned_stats)
         if points_left > 0:
-            draw_text(screen, f"Assign: {self.points_to_assign[len(self.assigned_stats)]}", w//2, y_pos + 30, self.font, WHITE, center=True)
+            lines.append((f"Assign: {self.points_to_assign[len(self.assigned_stats)]}", y_pos + 30, self.font, WHITE))
         for i, (key, value) in enumerate(self.stats.items()):
             color = WHITE
-            if self.step == 0 and i == self.current_selection_index: color = YELLOW
+            if self.step == 0 and i == self.selected_index: color = YELLOW
             if key in self.assigned_stats: color = GREEN
-            draw_text(screen, f"{key}: {value}", w//2, y_pos + 60 + i * 30, self.font, color, center=True)
+            lines.append((f"{key}: {value}", y_pos + 60 + i * 30, self.font, color))
         
         y_pos += 160
-        draw_text(screen, "2. Race", w//2, y_pos, self.font, GREY if self.step > 1 else WHITE, center=True)
+        lines.append(("2. Race", y_pos, self.font, GREY if self.step > 1 else WHITE))
         for i, race in enumerate(self.races):
             color = GREY
-            if self.step == 1 and i == self.current_selection_index: color = YELLOW
+            if self.step == 1 and i == self.selected_index: color = YELLOW
             if self.step > 1 and i == self.selections[1]: color = GREEN
-            draw_text(screen, race, w//2, y_pos + 30 + i * 30, self.font, color, center=True)
+            lines.append((race, y_pos + 30 + i * 30, self.font, color))
 
         y_pos += 130
-        draw_text(screen, "3. Hero Path", w//2, y_pos, self.font, GREY if self.step > 2 else WHITE, center=True)
+        lines.append(("3. Hero Path", y_pos, self.font, GREY if self.step > 2 else WHITE))
         for i, path in enumerate(self.paths):
             color = GREY
-            if self.step == 2 and i == self.current_selection_index: color = YELLOW
+            if self.step == 2 and i == self.selected_index: color = YELLOW
             if self.step > 2 and i == self.selections[2]: color = GREEN
-            draw_text(screen, path, w//2, y_pos + 30 + i * 30, self.font, color, center=True)
+            lines.append((path, y_pos + 30 + i * 30, self.font, color))
 
         y_pos += 130
-        draw_text(screen, "4. Skill Bonus (+5 to two skills)", w//2, y_pos, self.font, GREY if self.step > 3 else WHITE, center=True)
+        lines.append(("4. Skill Bonus (+5 to two skills)", y_pos, self.font, GREY if self.step > 3 else WHITE))
         if self.step == 3:
-            options = self.get_current_options()
-            for i, skill in enumerate(options):
-                color = YELLOW if i == self.current_selection_index else WHITE
-                draw_text(screen, skill, w//2, y_pos + 30 + i * 25, load_font(FONT_NAME, 20), color, center=True)
+            for i, skill in enumerate(self.menu_options):
+                color = YELLOW if i == self.selected_index else WHITE
+                lines.append((skill, y_pos + 30 + i * 25, self.skill_font, color))
         elif self.step > 3:
             for i, skill in enumerate(self.chosen_skills):
-                 draw_text(screen, f"+5 {skill}", w//2, y_pos + 30 + i * 25, load_font(FONT_NAME, 20), GREEN, center=True)
+                 lines.append((f"+5 {skill}", y_pos + 30 + i * 25, self.skill_font, GREEN))
 
         if self.step == 4:
-            draw_text(screen, "Begin Adventure", w//2, h - 70, self.header_font, YELLOW, center=True)
+            lines.append(("Begin Adventure", h - 70, self.header_font, YELLOW))
+
+        center_x = w // 2
+        layout = []
+        for text, y, font, color in lines:
+            text_surface = render_text(font, text, color)
+            layout.append((text_surface, text_surface.get_rect(center=(center_x, y))))
+        return layout
+
+    def draw(self, screen):
+        screen.fill(BLACK)
+        w, h = screen.get_size()
+        drawn_key = (self.step, self.selected_index, len(self.assigned_stats), len(self.chosen_skills))
+        # Positions and colors only depend on the selection state and screen size, so lay the text out once per change
+        layout_key = (w, h, drawn_key)
+        if layout_key != self.layout_key:
+            self.layout = self.build_layout(w, h)
+            self.layout_key = layout_key
+        text_rects = [screen.blit(text_surface, text_rect) for text_surface, text_rect in self.layout]
+
+        # A new screen size moves every line, so the last frame's text areas no longer apply
+        if (w, h) != self.drawn_size:
+            self.drawn_size = (w, h)
+            self.drawn_key = drawn_key
+            self.text_rects = text_rects
+            return None
+
+        # The screen only changes when a selection is moved or made, and then only where text was drawn
+        # last frame or this one, since everything else is background
+        if drawn_key == self.drawn_key:
+            return []
+        self.drawn_key = drawn_key
+        dirty_rects = self.text_rects + text_rects
+        self.text_rects = text_rects
+        return dirty_rects
 
 class GameOverScreen(BaseState):
     def __init__(self, game):
         super().__init__(game)
         self.font = load_font(FONT_NAME, 80)
+        self.hint_font = load_font(FONT_NAME, 30)
 
     def handle_events(self, event):
         if event.type == pygame.KEYDOWN:
@@ -275,4 +355,6 @@ class GameOverScreen(BaseState):
     def draw(self, screen):
         screen.fill(BLACK)
         draw_text(screen, "GAME OVER", screen.get_width()//2, screen.get_height()//2, self.font, RED, center=True)
-        draw_text(screen, "Press Enter to quit", screen.get_width()//2, screen.get_height()//2 + 80, load_font(FONT_NAME, 30), WHITE, center=True)
\ No newline at end of file
+        draw_text(screen, "Press Enter to quit", screen.get_width()//2, screen.get_height()//2 + 80, self.hint_font, WHITE, center=True)
+        # Nothing changes after the first frame
+        return []
\ No newline at end of file
@@ -6,6 +6,7 @@ import json
 import os
 import pyperclip # A library to handle clipboard functionality. You may need to install it: pip install pyperclip
 import copy
+import functools
 
 # --- CONFIGURATION ---
 FONT_NAME = "JetBrainsMonoNerdFontMono-Regular.ttf"
@@ -46,8 +47,9 @@ TOOLBAR_WIDTH = 60
 BOTTOM_BAR_HEIGHT = 60
 CANVAS_BG = C_BLACK 
 
+@functools.lru_cache(maxsize=None)
 def load_font(size):
-    """Loads the custom font file, with a fallback to a system font."""
+    """Loads the custom font file, with a fallback to a system font. Each size is loaded only once."""
     try:
         return pygame.font.Font(FONT_NAME, size)
     except pygame.error:
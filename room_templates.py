@@ -214,5 +214,42 @@ TEMPLATES = {
     }
 }
 
-# Define which characters are considered walkable.
-WALKABLE_TILES = "D.T"
\ No newline at end of file
+# Define which characters are considered walkable (a set, so tests are single-character hash lookups).
+WALKABLE_TILES = frozenset("D.T")
+
+class RoomType:
+    """Read-only data for one template, shared by every area built from it."""
+    __slots__ = ('name', 'room_data', 'width', 'height', 'span', 'walkable', 'door_columns', 'exits', 'exit_at', 'start_pos')
+    def __init__(self, name, template):
+        self.name = name
+        self.room_data = tuple(template['map'])
+        self.width = len(self.room_data[0])
+        self.height = len(self.room_data)
+        self.span = max(map(len, self.room_data))  # Widest row; some templates have ragged rows
+        # Local (x, y) of every walkable tile, so movement checks are one set lookup with no bounds or row-length tests
+        self.walkable = frozenset((x, y) for y, row in enumerate(self.room_data)
+                                  for x, char in enumerate(row) if char in WALKABLE_TILES)
+        # Local x of every 'D' tile, per row
+        self.door_columns = tuple(tuple(x for x, char in enumerate(row) if char == 'D') for row in self.room_data)
+        self.exits = template['exits']
+        self.exit_at = {coords: direction for direction, coords in self.exits.items()}
+        self.start_pos = template.get('start_pos', (1, 1))
+
+ROOM_TYPES = {key: RoomType(key, template) for key, template in TEMPLATES.items()}
+
+# Every character that can appear on the dungeon map
+TILE_CHARS = frozenset(char for room_type in ROOM_TYPES.values() for row in room_type.room_data for char in row)
+
+# Lookup indexes built once at import so room generation never scans TEMPLATES.
+# Key order follows TEMPLATES so random picks match a filtered scan.
+NON_START_TEMPLATE_KEYS = [key for key in TEMPLATES if key != 'start_room']
+
+def _build_templates_by_exit():
+    """Maps each exit direction to the keys of the non-start templates that have it."""
+    templates_by_exit = {}
+    for key in NON_START_TEMPLATE_KEYS:
+        for exit_direction in TEMPLATES[key]['exits']:
+            templates_by_exit.setdefault(exit_direction, []).append(key)
+    return templates_by_exit
+
+TEMPLATES_BY_EXIT = _build_templates_by_exit()
@@ -3,6 +3,8 @@
 
 import random
 
+from components import Stats, Info, SpellBook
+
 def load_spell_table(game_instance):
     """Load spells from the JSON data."""
     if hasattr(game_instance, 'spells_data') and 'spells' in game_instance.spells_data:
@@ -23,9 +25,7 @@ def get_spell_by_roll(roll, spell_table):
 
 def check_spell_book_unlock(world, player_id):
     """Check if spell book should be unlocked when Intelligence changes."""
-    from components import Stats, SpellBook
-    stats = world.get_component(player_id, "Stats")
-    spell_book = world.get_component(player_id, "SpellBook")
+    stats, spell_book = world.get_components(player_id, Stats, SpellBook)
     
     if spell_book and not spell_book.is_unlocked and stats.adj_int >= 50:
         spell_book.is_unlocked = True
@@ -34,7 +34,7 @@ def check_spell_book_unlock(world, player_id):
 
 def add_random_spell(world, player_id, game_instance):
     """Add a random spell from the spell table to the player's spell book."""
-    spell_book = world.get_component(player_id, "SpellBook")
+    spell_book = world.get_component(player_id, SpellBook)
     if not spell_book:
         return None
     
@@ -69,11 +69,8 @@ def pay_spell_cost(stats, spell):
 
 def apply_spell_effect(world, player_id, monster_id, spell, success_roll):
     """Apply the effect of a successfully cast spell."""
-    from components import Stats
-    
-    stats = world.get_component(player_id, "Stats")
-    monster_stats = world.get_component(monster_id, "Stats") if monster_id else None
-    monster_info = world.get_component(monster_id, "Info") if monster_id else None
+    stats = world.get_component(player_id, Stats)
+    monster_stats, monster_info = world.get_components(monster_id, Stats, Info) if monster_id is not None else (None, None)
     
     effect = spell['effect']
     spell_name = spell['name']
@@ -207,8 +204,7 @@ def apply_spell_effect(world, player_id, monster_id, spell, success_roll):
     
     elif effect == 'resurrection':
         # Add a life point box when adventurer next dies (auto-resurrection)
-        from components import Info
-        info = world.get_component(player_id, "Info")
+        info = world.get_component(player_id, Info)
         if info:
             info.life_points += 1
             return f"Cast {spell_name}, gained an extra life point!"
@@ -220,7 +216,7 @@ def apply_spell_effect(world, player_id, monster_id, spell, success_roll):
 # Function to give starting spells to Sorcerer path
 def give_sorcerer_starting_spells(world, player_id, game_instance):
     """Give starting spells to Sorcerer characters."""
-    spell_book = world.get_component(player_id, "SpellBook")
+    spell_book = world.get_component(player_id, SpellBook)
     if not spell_book:
         return []
     
@@ -248,8 +244,7 @@ def enhanced_open_spell_submenu(combat_screen):
     combat_screen.submenu_items = []
     combat_screen.submenu_selected = 0
     
-    stats = combat_screen.world.get_component(combat_screen.player_id, "Stats")
-    spell_book = combat_screen.world.get_component(combat_screen.player_id, "SpellBook")
+    stats, spell_book = combat_screen.world.get_components(combat_screen.player_id, Stats, SpellBook)
     
     # Check if spell book is unlocked (Int >= 50)
     if not spell_book or not spell_book.is_unlocked:
@@ -295,7 +290,7 @@ def enhanced_handle_spell_action(combat_screen, spell_item):
         return
     
     spell = spell_item['spell_data']
-    stats = combat_screen.world.get_component(combat_screen.player_id, "Stats")
+    stats = combat_screen.world.get_component(combat_screen.player_id, Stats)
     
     # Pay the spell cost first
     pay_spell_cost(stats, spell)
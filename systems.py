@@ -3,12 +3,23 @@
 
 import pygame
 import random
+import functools
 from config import FONT_NAME
+from components import Stats, Skills, Item, Inventory, Equipment, Slot
 
 def d100():
     """Helper function for dice rolls."""
     return random.randint(1, 100)
 
+def roll_attack(target_value, damage_mod, defense):
+    """Rolls a d100 attack against target_value and a d6 for damage. Returns (hit, damage, roll)."""
+    roll = d100()
+    if roll > target_value:
+        return False, 0, roll
+    return True, max(0, random.randint(1, 6) + damage_mod - defense), roll
+
+# Fonts are shared by every state, one per (name, size), so glyph caches survive between screens
+@functools.lru_cache(maxsize=None)
 def load_font(name, size):
     """Safely loads a font, falling back to the default if not found."""
     try:
@@ -17,87 +28,116 @@ def load_font(name, size):
         print(f"Warning: Font '{name}' not found. Falling back to default.")
         return pygame.font.Font(None, size)
 
-def draw_text(surface, text, x, y, font, color, center=False):
-    """Renders and draws text onto a surface."""
+@functools.lru_cache(maxsize=512)
+def render_text(font, text, color):
+    """Renders a line of text, reusing the surface for repeated (font, text, color) calls."""
     text_surface = font.render(text, True, color)
+    # Match the display's pixel format once so every later blit is a straight copy
+    return text_surface.convert_alpha() if pygame.display.get_surface() else text_surface
+
+def draw_text(surface, text, x, y, font, color, center=False):
+    """Draws text onto a surface, rendering it only the first time it is seen. Returns the area drawn."""
+    text_surface = render_text(font, text, color)
     text_rect = text_surface.get_rect()
     if center:
         text_rect.center = (x, y)
     else:
         text_rect.topleft = (x, y)
-    surface.blit(text_surface, text_rect)
+    return surface.blit(text_surface, text_rect)
+
+def apply_item_bonuses(stats, item, sign=1):
+    """Adds (sign=1) or removes (sign=-1) an item's bonuses from the running equipment totals."""
+    if not item or not item.bonuses: return
+    totals = stats.equipment_bonuses
+    for key, value in item.bonuses.items():
+        if key in totals:
+            totals[key] += sign * value
 
 def update_player_stats(world, player_id):
-    """Recalculates a player's adjusted stats based on their equipped items."""
-    player_stats = world.get_component(player_id, "Stats")
-    equipment = world.get_component(player_id, "Equipment")
-    if not player_stats or not equipment: return
-
-    # Reset adjusted stats to their base primary values
-    player_stats.adj_str = player_stats.primary_str
-    player_stats.adj_dex = player_stats.primary_dex
-    player_stats.adj_int = player_stats.primary_int
-    player_stats.max_hp = player_stats.primary_hp
-    player_stats.defense = 0
-    player_stats.damage_mod = 0
-    
-    # Apply bonuses from each equipped item
-    for item_id in equipment.slots.values():
-        if item_id:
-            item = world.get_component(item_id, "Item")
-            if item and item.bonuses:
-                player_stats.adj_str += item.bonuses.get("str", 0)
-                player_stats.adj_dex += item.bonuses.get("dex", 0)
-                player_stats.adj_int += item.bonuses.get("int", 0)
-                player_stats.max_hp += item.bonuses.get("hp", 0)
-                player_stats.defense += item.bonuses.get("def", 0)
-                player_stats.damage_mod += item.bonuses.get("dmg", 0)
+    """Recalculates a player's adjusted stats from their primary stats and equipment bonus totals."""
+    player_stats = world.get_component(player_id, Stats)
+    if not player_stats: return
+
+    # Equipment bonuses are kept up to date at equip time, so no need to walk the slots here
+    bonuses = player_stats.equipment_bonuses
+    player_stats.adj_str = player_stats.primary_str + bonuses["str"]
+    player_stats.adj_dex = player_stats.primary_dex + bonuses["dex"]
+    player_stats.adj_int = player_stats.primary_int + bonuses["int"]
+    player_stats.max_hp = player_stats.primary_hp + bonuses["hp"]
+    player_stats.defense = bonuses["def"]
+    player_stats.damage_mod = bonuses["dmg"]
     
     # Ensure current HP does not exceed the new max HP
     player_stats.current_hp = min(player_stats.current_hp, player_stats.max_hp)
 
+def equip_item(world, player_id, item_id):
+    """Equips an item from the player's inventory, moving whatever it displaces back there; returns the Item.
+
+    A two-handed weapon is held in the main hand and also frees the off hand, and
+    an off-hand item frees a two-handed weapon held in the main hand.
+    """
+    equipment, inventory, stats = world.get_components(player_id, Equipment, Inventory, Stats)
+    item = world.get_component(item_id, Item)
+    slot = item.slot_id
+    freed_slots = [slot]
+    if item.slot == 'two_hand':
+        freed_slots.append(Slot.OFF_HAND)
+    elif slot == Slot.OFF_HAND:
+        main_hand_id = equipment.slots[Slot.MAIN_HAND]
+        if main_hand_id is not None and world.get_component(main_hand_id, Item).slot == 'two_hand':
+            freed_slots.append(Slot.MAIN_HAND)
+
+    for freed_slot in freed_slots:
+        old_item_id = equipment.slots[freed_slot]
+        if old_item_id is not None:
+            equipment.slots[freed_slot] = None
+            inventory.add(old_item_id)
+            apply_item_bonuses(stats, world.get_component(old_item_id, Item), -1)
+
+    equipment.slots[slot] = item_id
+    inventory.remove(item_id)
+    apply_item_bonuses(stats, item)
+    update_player_stats(world, player_id)
+    return item
+
+def fill_pips(track, pips_to_add):
+    """Marks the next empty boxes on an XP track in one slice; returns True when the track is full."""
+    filled = min(len(track), track.count(1) + pips_to_add)
+    track[:filled] = b'\x01' * filled
+    return filled == len(track)
+
 def award_experience(world, player_id, name, pips_to_add=1):
     """Adds experience pips to a stat or skill and handles leveling up."""
-    stats = world.get_component(player_id, "Stats")
-    skills = world.get_component(player_id, "Skills")
+    stats, skills = world.get_components(player_id, Stats, Skills)
     name_lower = name.lower()
     
     if name_lower in stats.xp_pips:
         # Awarding XP to a Stat
         if name_lower in stats.attuned_stats: pips_to_add *= 2
         track = stats.xp_pips[name_lower]
-        for _ in range(pips_to_add):
-            if 0 in track: track[track.index(0)] = 1
-        
-        if 0 not in track: # Level up!
+        if fill_pips(track, pips_to_add): # Level up!
             setattr(stats, f"primary_{name_lower}", getattr(stats, f"primary_{name_lower}") + 5)
-            stats.xp_pips[name_lower] = [0] * 10
+            stats.xp_pips[name_lower] = bytearray(10)
             update_player_stats(world, player_id)
             print(f"{name.upper()} increased by 5!")
 
-    elif name in skills.skills:
+    elif name in skills.bonuses:
         # Awarding XP to a Skill
-        skill_data = skills.skills[name]
-        if skill_data['attuned']: pips_to_add *= 2
-        track = skill_data['xp_pips']
-        for _ in range(pips_to_add * 2): # Rule: 2 pips for assisted skills
-            if 0 in track: track[track.index(0)] = 1
-
-        if 0 not in track: # Level up!
-            skill_data['bonus'] += 5
-            skill_data['xp_pips'] = [0] * 10
+        if name in skills.attuned: pips_to_add *= 2
+        track = skills.xp_pips[name]
+        if fill_pips(track, pips_to_add * 2): # Rule: 2 pips for assisted skills. Level up!
+            skills.bonuses[name] += 5
+            skills.xp_pips[name] = bytearray(10)
             print(f"Skill {name} increased by 5!")
 
 def perform_test(world, player_id, characteristic, modifier, assisting_skills):
     """Performs a d100 test, handles XP gain, and returns the result."""
-    stats = world.get_component(player_id, "Stats")
-    skills = world.get_component(player_id, "Skills")
+    stats, skills = world.get_components(player_id, Stats, Skills)
     char_lower = characteristic.lower()
 
     target_value = getattr(stats, f"adj_{char_lower}") + modifier
     for skill_name in assisting_skills:
-        if skill_name in skills.skills:
-            target_value += skills.skills[skill_name]['bonus']
+        target_value += skills.bonuses.get(skill_name, 0)
     
     roll = d100()
     
@@ -35,6 +35,11 @@ DOOR_TABLE = {
 }
 
 
+# Sorted roll keys for the tables above, so lookups can binary-search them
+MAPPING_KEYS = tuple(sorted(k for k in MAPPING_TABLE if isinstance(k, int)))
+DOOR_KEYS = tuple(sorted(k for k in DOOR_TABLE if isinstance(k, int)))
+
+
 # Reference: Page 45, Table G - Geographic
 # A simplified version for demonstration.
 GEOGRAPHIC_TABLE = {